@@ -0,0 +1,3 @@
+@echo off
+python benchmark.py %*
+pause
\ No newline at end of file
@@ -0,0 +1,153 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import pipeline    # Agrega GenerateCatalogueSiasam y UpdateSiasam al path
+import generate_catalogue
+import update_by_siasam
+from generate_synthetic_data import makeSyntheticInputs
+
+# Parametros de makeSyntheticInputs para cada escala
+SCALES = {
+    'small': {'number_plants': 40, 'max_units': 4, 'number_years': 3, 'siasam_per_unit': 6, 'fixed_per_unit': 1},
+    'medium': {'number_plants': 400, 'max_units': 4, 'number_years': 3, 'siasam_per_unit': 6, 'fixed_per_unit': 1},
+    'large': {'number_plants': 2000, 'max_units': 6, 'number_years': 5, 'siasam_per_unit': 10, 'fixed_per_unit': 2},
+}
+SEED = 1
+FIRST_YEAR = 2025
+SYSTEM_CODE = 1
+STAGES = ['catalogue_load', 'catalogue_expand', 'catalogue_save', 'siasam_load', 'siasam_update']
+# Salidas que se comparan con los resultados de referencia (golden.json)
+OUTPUT_FILES = [
+    'faltando_catalogo.csv',
+    'solicitudes_minimas.csv',
+    'precedencia_solicitudes_minimas.csv',
+    'optmcfg.csv',
+    'optmprec.csv',
+    'siasam_association_constraints.csv',
+    'siasam_irregularities_overlap.txt',
+    'siasam_irregularities_duplicates.txt',
+    'siasam_irregularities_fixed_duplicates.txt',
+    'siasam_irregularities_fixed_overlap.txt',
+]
+GOLDEN_FILE = os.path.join(BENCHMARK_DIR, 'golden.json')
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+TOLERANCE = 0.25    # Una etapa mas de 25% mas lenta que la linea base se marca como regresion
+
+def file_sha256(file_path):
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+def runScale(scale, work_dir):
+    # Genera los datos de la escala y corre las dos rutinas como lo harian sus scripts: el catalogo se escribe en
+    # la carpeta de datos y UpdateSiasam lo lee de ahi. Devuelve los tiempos por etapa y el sha256 de cada salida.
+    data_dir = os.path.join(work_dir, scale, 'datos')
+    output_dir = os.path.join(work_dir, scale, 'salida')
+    params = SCALES[scale]
+    os.makedirs(output_dir, exist_ok=True)
+    makeSyntheticInputs(data_dir, first_year=FIRST_YEAR, seed=SEED, **params)
+    times = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        catalogue_inputs = generate_catalogue.loadCatalogueInputs(data_dir)
+        times['catalogue_load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        maintenanceSolicitations, precedenceConstraints, faltando_catalogo = generate_catalogue.generateCatalogue(
+            data_dir, FIRST_YEAR, params['number_years'], None, catalogue_inputs
+        )
+        times['catalogue_expand'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        generate_catalogue.saveCatalogue(maintenanceSolicitations, precedenceConstraints, faltando_catalogo, data_dir, False)
+        times['catalogue_save'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        siasam_inputs = update_by_siasam.loadSiasamInputs(data_dir, SYSTEM_CODE)
+        times['siasam_load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        update_by_siasam.updateSiasam(data_dir, output_dir, SYSTEM_CODE, inputs=siasam_inputs)
+        times['siasam_update'] = time.perf_counter() - start
+    hashes = {}
+    for file_name in OUTPUT_FILES:
+        file_path = os.path.join(output_dir, file_name)
+        if not os.path.exists(file_path):
+            file_path = os.path.join(data_dir, file_name)
+        hashes[file_name] = file_sha256(file_path) if os.path.exists(file_path) else None
+    return times, hashes
+
+def loadJson(file_path):
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path) as file:
+        return json.load(file)
+
+def saveJson(data, file_path):
+    with open(file_path, 'w') as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+def runBenchmark(scales, work_dir, repeat=1, update_golden=False, save_baseline=False):
+    # Corre cada escala repeat veces y se queda con el menor tiempo de cada etapa. Devuelve True si todas las
+    # salidas coinciden con golden.json (las escalas sin referencia guardada no se comparan).
+    golden = loadJson(GOLDEN_FILE)
+    baseline = loadJson(BASELINE_FILE)
+    all_match = True
+    for scale in scales:
+        best_times = None
+        for _ in range(repeat):
+            times, hashes = runScale(scale, work_dir)
+            best_times = times if best_times is None else {stage: min(best_times[stage], times[stage]) for stage in STAGES}
+        print(f"Escala {scale} ({SCALES[scale]['number_plants']} plantas):")
+        for stage in STAGES:
+            line = f"  {stage:<18}{best_times[stage]:9.3f} s"
+            if scale in baseline and stage in baseline[scale]:
+                ratio = best_times[stage] / baseline[scale][stage] if baseline[scale][stage] > 0 else 1.0
+                line += f"  linea base {baseline[scale][stage]:9.3f} s  x{ratio:.2f}"
+                if ratio > 1 + TOLERANCE:
+                    line += '  REGRESION'
+            print(line)
+        if update_golden:
+            golden[scale] = hashes
+        elif scale in golden:
+            differing = [file_name for file_name in OUTPUT_FILES if golden[scale].get(file_name) != hashes[file_name]]
+            if differing:
+                all_match = False
+                print(f"  Salidas distintas de la referencia: {', '.join(differing)}")
+            else:
+                print('  Salidas iguales a la referencia.')
+        else:
+            print('  Sin resultados de referencia para esta escala (usar --update-golden).')
+        if save_baseline:
+            baseline[scale] = best_times
+    if update_golden:
+        saveJson(golden, GOLDEN_FILE)
+    if save_baseline:
+        saveJson(baseline, BASELINE_FILE)
+    return all_match
+
+def main():
+    parser = argparse.ArgumentParser(description='Mide cada etapa de las dos rutinas con datos sinteticos y compara las salidas con las de referencia.')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small', 'medium'])
+    parser.add_argument('--work-dir', default=os.path.join(BENCHMARK_DIR, 'corridas'), help='Carpeta para los datos generados y las salidas')
+    parser.add_argument('--repeat', type=int, default=1, help='Corridas por escala; se guarda el menor tiempo de cada etapa')
+    parser.add_argument('--update-golden', action='store_true', help='Guarda las salidas actuales como referencia en golden.json')
+    parser.add_argument('--save-baseline', action='store_true', help='Guarda los tiempos actuales como linea base en baseline.json')
+    args = parser.parse_args()
+    all_match = runBenchmark(args.scales, args.work_dir, args.repeat, args.update_golden, args.save_baseline)
+    sys.exit(0 if all_match else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+import datetime
+import os
+import random
+import string
+import sys
+
+import pandas as pd
+
+# Reglas de catalogo por tecnologia: (intervalo en dias, duracion en dias)
+TECH_RULES = {
+    'TG': [(365, 10), (1095, 30)],
+    'TV': [(730, 20), (2190, 45)],
+    'HID': [(1460, 25)],
+    'CC': [(365, 7), (730, 15), (1825, 40)],
+}
+TECH_NAMES = {0: 'Termica', 1: 'Hidro mayor', 6: 'Hidro menor'}
+AREAS = ['AR', 'BR', 'CR']
+
+def makeSyntheticInputs(output_dir, number_plants=40, max_units=4, number_years=3, siasam_per_unit=6, fixed_per_unit=1, first_year=2025, seed=1):
+    # Escribe en output_dir todas las entradas de GenerateCatalogueSiasam y de UpdateSiasam para number_plants
+    # plantas inventadas. Con la misma semilla se generan siempre los mismos archivos. Incluye los casos
+    # irregulares que el flujo debe manejar: plantas sin catalogo, reglas especificas por planta, codigos de
+    # unidad que no coinciden, nombres SIASAM con char160, solicitudes casi duplicadas y de planta completa.
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    plants = makePlants(rng, number_plants, max_units)
+    writeCatalogueInputs(rng, output_dir, plants)
+    writeSiasamInputs(rng, output_dir, plants, number_years, siasam_per_unit, fixed_per_unit, first_year)
+
+def makePlants(rng, number_plants, max_units):
+    # Lista de (nombre SDDP, tipo, codigo, unidades, nombre corto); una de cada 9 plantas tiene regla especifica
+    plants = []
+    used_names = set()
+    letters = string.ascii_uppercase.replace('U', '')
+    for plant_index in range(number_plants):
+        while True:
+            name = ''.join(rng.choice(letters) for _ in range(4))
+            if name not in used_names:
+                used_names.add(name)
+                break
+        plant_name = 'C-' + name + '-1' if plant_index % 9 == 5 else name
+        plant_type = rng.choice([0, 0, 1, 6])
+        plants.append((plant_name, plant_type, 100 + plant_index, rng.randint(1, max_units), name))
+    return plants
+
+def writeCatalogueInputs(rng, output_dir, plants):
+    catalogue = [(tech, interval, duration) for tech, rules in TECH_RULES.items() for interval, duration in rules]
+    catalogue += [(plant_name[2:], 540, 12) for plant_name, _, _, _, _ in plants if plant_name.startswith('C-')]
+    pd.DataFrame(catalogue, columns=['Codigo Tecnologia', 'Intervalo', 'Duracao']).to_csv(
+        os.path.join(output_dir, 'catalogo_general_completo.csv'), index=False
+    )
+
+    # Tecnologias: algunas por nombre exacto, otras por coincidencia parcial y otras faltan
+    tech_rows = []
+    for plant_index, (plant_name, _, _, _, name) in enumerate(plants):
+        case = plant_index % 5
+        if case == 0:
+            tech_rows.append((plant_name, rng.choice(list(TECH_RULES))))
+        elif case in (1, 2):
+            tech_rows.append(('X' + name[:3] + 'Z' + str(plant_index), rng.choice(list(TECH_RULES))))
+        elif case == 3:
+            tech_rows.append((plant_name + 'B', rng.choice(list(TECH_RULES))))
+    tech_rows.append(('ZZZQ', 'NOPE'))
+    pd.DataFrame(tech_rows, columns=['Nombre', 'Tecnologia']).to_csv(os.path.join(output_dir, 'tecnologias_plantas.csv'), index=False)
+
+    pd.DataFrame(
+        [(plant_name, plant_type, plant_code, units) for plant_name, plant_type, plant_code, units, _ in plants],
+        columns=['Nome', 'Tipo', 'Codigo', 'Unidades']
+    ).to_csv(os.path.join(output_dir, 'plantas_para_catalogo.csv'), index=False)
+
+    # Codigos de unidad no secuenciales; la mitad con un numero de unidades que no coincide
+    with open(os.path.join(output_dir, 'optmuntcod.csv'), 'w') as f:
+        f.write('!Nombre,Tipo,Sistema,NumUnidades,Codigos\n')
+        for plant_index, (plant_name, plant_type, _, units, _) in enumerate(plants):
+            if plant_index % 7 == 3:
+                number_codes = units if plant_index % 14 == 3 else units + 1
+                f.write(f"{plant_name},{plant_type},1,{number_codes}," + ','.join(str(10 + 2 * k) for k in range(number_codes)) + '\n')
+
+    history = []
+    for plant_name, _, _, units, _ in plants:
+        for unit in range(1, units + 1):
+            for _ in range(rng.randint(0, 4)):
+                start_date = datetime.date(2021, 1, 1) + datetime.timedelta(days=rng.randint(0, 1200))
+                history.append((f"{plant_name}-U{unit}", start_date.strftime('%m/%d/%Y'), rng.choice([7, 10, 12, 15, 20, 30, 45, 25, 40])))
+    rng.shuffle(history)
+    pd.DataFrame(history, columns=['Nome SIASAM', 'Saida', 'Duracao']).to_csv(os.path.join(output_dir, 'historico.csv'), index=False)
+
+def writeSiasamInputs(rng, output_dir, plants, number_years, siasam_per_unit, fixed_per_unit, first_year):
+    # Correspondencia: cada unidad con su nombre SIASAM, el de la planta y a veces un alias extra
+    correspondence = []
+    plant_areas = {}
+    for plant_index, (plant_name, plant_type, plant_code, units, name) in enumerate(plants):
+        area = rng.choice(AREAS)
+        plant_areas[plant_name] = area
+        for unit in range(1, units + 1):
+            correspondence.append((plant_code, plant_name, unit, TECH_NAMES[plant_type], area, f"{area}-{name}{unit:02d}"))
+            correspondence.append((plant_code, plant_name, unit, TECH_NAMES[plant_type], area, f"{area}-{name}"))
+            if plant_index % 4 == 0:
+                correspondence.append((plant_code, plant_name, unit, TECH_NAMES[plant_type], area, f"{area}-{name}X{unit}"))
+    correspondence.append((999, 'NOPLANT', 1, 'Termica', 'AR', 'AR-NOPL01'))
+    pd.DataFrame(correspondence, columns=['Codigo', 'Nombre', 'Unidad', 'Tecnologia', 'Area', 'NombreSiasam']).to_csv(
+        os.path.join(output_dir, '01-04Feb-CorrespondenciaCentrales_SDDP_SIASAM.csv'), index=False
+    )
+
+    first_date = datetime.date(first_year, 1, 1)
+    counter = 0
+    siasam = []
+    for plant_name, _, _, units, name in plants:
+        area = plant_areas[plant_name]
+        for unit in range(1, units + 1):
+            for _ in range(siasam_per_unit):
+                counter += 1
+                start_date = first_date + datetime.timedelta(days=rng.randint(-30, 365 * number_years))
+                duration = rng.randint(1, 40)
+                equipment = f"{name}-U{unit}" if rng.random() < 0.9 else f"{name}\xa0-U{unit}"
+                siasam.append(getSiasamRow(equipment, 'UG', start_date, duration, f"{area}-{10000 + counter}"))
+                if rng.random() < 0.15:
+                    # Casi duplicada: fecha y duracion dentro de +-2 dias
+                    counter += 1
+                    near_date = start_date + datetime.timedelta(days=rng.randint(-2, 2))
+                    near_duration = max(1, duration + rng.randint(-2, 2))
+                    siasam.append(getSiasamRow(f"{name}-U{unit}", 'UG', near_date, near_duration, f"{area}-{10000 + counter}"))
+        if rng.random() < 0.3:
+            counter += 1
+            start_date = first_date + datetime.timedelta(days=rng.randint(0, 365 * number_years))
+            siasam.append(getSiasamRow(name, 'CG', start_date, rng.randint(1, 20), f"{area}-{10000 + counter}"))
+    siasam.append(['QQQQ-U1', 'UG', '01/02/2025  08:00', '05/02/2025  08:00', 4, 'x', 'y', 'z', 'w', 'v', 'AR-99999'])
+    pd.DataFrame(siasam, columns=['Equipo', 'Tipo', 'Inicio', 'Fin', 'Duracion', 'c5', 'c6', 'c7', 'c8', 'c9', 'Codigo']).to_csv(
+        os.path.join(output_dir, 'solicitudes_siasam.csv'), index=False
+    )
+
+    association = [plants[plant_index][4] + '-U1' for plant_index in range(0, len(plants), 11)]
+    pd.DataFrame({'Nombre': association}).to_csv(os.path.join(output_dir, 'siasam_associacion.csv'), index=False)
+
+    with open(os.path.join(output_dir, 'solicitudes_siasam_fijas.csv'), 'w') as f:
+        f.write('Area,A,B,Solicitud,Unidad,C,D,E,Inicio,Duracion\n')
+        f.write('area,a,b,sol,unidad,c,d,e,inicio,dias\n')
+        for plant_name, _, _, units, name in plants:
+            area = plant_areas[plant_name]
+            for unit in range(1, units + 1):
+                for _ in range(fixed_per_unit):
+                    if rng.random() < 0.5:
+                        continue
+                    counter += 1
+                    start_date = first_date + datetime.timedelta(days=rng.randint(0, 365 * number_years))
+                    f.write(f"{area},a,b,F{counter},{name}-U{unit},c,d,e,{start_date.strftime('%d/%m/%Y')},{rng.randint(1, 30)}\n")
+
+def getSiasamRow(equipment, equipment_type, start_date, duration, code):
+    end_date = start_date + datetime.timedelta(days=duration)
+    return [
+        equipment, equipment_type,
+        start_date.strftime('%d/%m/%Y') + '  08:00', end_date.strftime('%d/%m/%Y') + '  17:00',
+        duration, 'x', 'y', 'z', 'w', 'v', code
+    ]
+
+if __name__ == '__main__':
+    # python generate_synthetic_data.py <carpeta> [plantas] [semilla]
+    arguments = sys.argv[1:]
+    makeSyntheticInputs(
+        arguments[0],
+        number_plants=int(arguments[1]) if len(arguments) > 1 else 40,
+        seed=int(arguments[2]) if len(arguments) > 2 else 1
+    )
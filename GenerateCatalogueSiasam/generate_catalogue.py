@@ -1,76 +1,59 @@
 from generate_catalogue_utils import *
 import csv
+import os
 
 FIRST_YEAR = 2025
 NUMBER_OF_YEARS = 3
+COLUMNAR_HANDOFF = False    # Guarda tambien una copia binaria (carpeta .columns) de cada salida, que UpdateSiasam lee en lugar del CSV
+CATALOGUE_CACHE = None    # Archivo con los bloques por planta de la corrida anterior, p. ej. 'cache_catalogo.pkl' (None = sin cache)
 
-faltando_catalogo = []
-historicalMaintenances = HistoricalMaintenances('historico.csv')
-plantTechs = PlantTechs('tecnologias_plantas.csv')
-catalogue = MaintenanceCatalogue('catalogo_general_completo.csv', plantTechs)
-maintenanceSolicitations = MaintenanceSolicitations()
-precedenceConstraints = PrecedenceConstraints()
-unitCodes = UnitCodes('optmuntcod.csv')
+def loadCatalogueInputs(input_dir='.'):
+    # Entradas que no dependen del horizonte; se pueden leer una sola vez para varias corridas
+    inputs = {}
+    inputs['historicalMaintenances'] = HistoricalMaintenances(os.path.join(input_dir, 'historico.csv'))
+    inputs['plantTechs'] = PlantTechs(os.path.join(input_dir, 'tecnologias_plantas.csv'))
+    inputs['catalogue'] = MaintenanceCatalogue(os.path.join(input_dir, 'catalogo_general_completo.csv'), inputs['plantTechs'])
+    inputs['unitCodes'] = UnitCodes(os.path.join(input_dir, 'optmuntcod.csv'))
+    inputs['df_plants'] = pd.read_csv(os.path.join(input_dir, 'plantas_para_catalogo.csv'))
+    return inputs
 
-# Faz solicitacoes para usinas termicas
-df_plants = pd.read_csv('plantas_para_catalogo.csv')
-for index, row in df_plants.iterrows():
-    plant_name = row['Nome']
-    plant_type = row['Tipo']
-    plant_code = row['Codigo']
-    number_units = int(row['Unidades'])
-    catalogueRules = catalogue.getCatalogueRules(plant_name)
-    if catalogueRules is None:
-        print(f"Aviso: Regla de maintenimiento no fue encontrada para {plant_name}")
-        faltando_catalogo.append(plant_name)
-        continue
-    for unit in range(1, number_units + 1):
-        if unitCodes.hasUnitCodes(plant_name, plant_type):
-            if unitCodes.hasValidUnitCodes(plant_name, plant_type, number_units):
-                unit = unitCodes.getUnitCode(plant_name, plant_type, unit)
-            else:
-                print(f"Aviso: Planta {plant_name} esta en el archivo de codigos de unidades pero no lo numero de unidades no coincide")
-        count_sol = 1
-        for catalogueRule in catalogueRules:
-            latest_maintenance = historicalMaintenances.getLatestMaintenance(plant_name, unit, catalogueRule.duration)
-            if latest_maintenance == None:
-                next_date_min = datetime.datetime(FIRST_YEAR, 1, 1)
-            else:
-                next_date_min = latest_maintenance.start_date + datetime.timedelta(days=catalogueRule.interval)
-            num_maint_horizon = 1 + int((NUMBER_OF_YEARS * 365 - catalogueRule.interval) / ((next_date_min - datetime.datetime(FIRST_YEAR, 1, 1)).days + catalogueRule.interval))
-            for count_prec in range(1, num_maint_horizon + 1):
-                maintenanceSolicitations.newSolicitation(
-                    f"CAT{count_sol}-n{count_prec}-{plant_name}-U{unit}",
-                    plant_code,
-                    plant_type,
-                    None,
-                    plant_name,
-                    unit,
-                    ajust_date_lower(next_date_min),
-                    ajust_date_upper(next_date_min + datetime.timedelta(days=catalogueRule.interval) + datetime.timedelta(days=catalogueRule.duration)),
-                    catalogueRule.duration
-                )
-                if num_maint_horizon > 1:
-                    if count_prec > 1:
-                        precedenceConstraints.addLine(
-                            f"CAT{count_sol}-{plant_name}-U{unit}",
-                            f"CAT{count_sol}-n{count_prec}-{plant_name}-U{unit}",
-                            catalogueRule.interval_min,
-                            catalogueRule.interval_max
-                        )
-                    else:
-                        precedenceConstraints.addLine(
-                            f"CAT{count_sol}-{plant_name}-U{unit}",
-                            f"CAT{count_sol}-n{count_prec}-{plant_name}-U{unit}",
-                            0,
-                            0
-                        )
-                next_date_min = next_date_min + datetime.timedelta(days=catalogueRule.interval)
-            count_sol += 1
+def generateCatalogue(input_dir='.', first_year=FIRST_YEAR, number_of_years=NUMBER_OF_YEARS, catalogue_cache=CATALOGUE_CACHE, inputs=None):
+    # Devuelve (solicitudes, restricciones de precedencia, plantas sin catalogo) sin escribir nada en disco
+    if inputs is None:
+        inputs = loadCatalogueInputs(input_dir)
+    maintenanceSolicitations = MaintenanceSolicitations()
+    precedenceConstraints = PrecedenceConstraints()
+    catalogueCache = None if catalogue_cache is None else CatalogueCache(catalogue_cache)
 
-maintenanceSolicitations.saveSolicitations('solicitudes_minimas.csv')
-precedenceConstraints.saveConstraints('precedencia_solicitudes_minimas.csv')
+    # Faz solicitacoes para usinas termicas
+    faltando_catalogo = expandCatalogue(
+        inputs['df_plants'],
+        inputs['catalogue'],
+        inputs['historicalMaintenances'],
+        inputs['unitCodes'],
+        maintenanceSolicitations,
+        precedenceConstraints,
+        first_year,
+        number_of_years,
+        catalogueCache
+    )
+    if catalogueCache is not None:
+        catalogueCache.save()
+    return maintenanceSolicitations, precedenceConstraints, faltando_catalogo
 
-with open('faltando_catalogo.csv', 'w', newline='') as file:
-    writer = csv.writer(file)
-    writer.writerows([[name] for name in faltando_catalogo])
+def saveFaltandoCatalogo(faltando_catalogo, output_file_path):
+    with open(output_file_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerows([[name] for name in faltando_catalogo])
+
+def saveCatalogue(maintenanceSolicitations, precedenceConstraints, faltando_catalogo, output_dir='.', save_columns=COLUMNAR_HANDOFF):
+    maintenanceSolicitations.saveSolicitations(os.path.join(output_dir, 'solicitudes_minimas.csv'), save_columns=save_columns)
+    precedenceConstraints.saveConstraints(os.path.join(output_dir, 'precedencia_solicitudes_minimas.csv'), save_columns=save_columns)
+    saveFaltandoCatalogo(faltando_catalogo, os.path.join(output_dir, 'faltando_catalogo.csv'))
+
+def main():
+    maintenanceSolicitations, precedenceConstraints, faltando_catalogo = generateCatalogue()
+    saveCatalogue(maintenanceSolicitations, precedenceConstraints, faltando_catalogo)
+
+if __name__ == '__main__':
+    main()
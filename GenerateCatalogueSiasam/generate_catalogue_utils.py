@@ -1,6 +1,13 @@
+import array
+import bisect
+import collections.abc
 import datetime
+import hashlib
+import json
+import numpy as np
+import os
 import pandas as pd
-from tqdm import tqdm
+import pickle
 
 def round_hour_to_date(date_string):
     return datetime.datetime.strptime(date_string, "%m/%d/%Y  %H:%M").date()
@@ -33,6 +40,238 @@ def ajust_date_upper(date):
         semester_start_year = year - 1
     return datetime.datetime(year=semester_start_year, month=semester_end_month, day=30 if semester_end_month == 6 else 31)
 
+def ajust_dates_lower(dates):
+    # Version vectorizada de ajust_date_lower para un arreglo datetime64[D]
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    month = months % 12 + 1
+    semester_start = months - (month - 1) + np.where(month <= 3, 0, np.where(month <= 9, 6, 12))
+    return semester_start.astype('datetime64[M]').astype('datetime64[D]')
+
+def ajust_dates_upper(dates):
+    # Version vectorizada de ajust_date_upper para un arreglo datetime64[D]
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    month = months % 12 + 1
+    semester_end = months - (month - 1) + np.where(month >= 10, 11, np.where(month >= 4, 5, -1))
+    return (semester_end + 1).astype('datetime64[M]').astype('datetime64[D]') - np.timedelta64(1, 'D')
+
+def expandCatalogue(df_plants, catalogue, historicalMaintenances, unitCodes, maintenanceSolicitations, precedenceConstraints, first_year, number_of_years, catalogueCache=None):
+    plant_names = df_plants['Nome'].tolist()
+    plant_types = df_plants['Tipo'].tolist()
+    plant_codes = df_plants['Codigo'].tolist()
+    plant_units = df_plants['Unidades'].tolist()
+    plants = list(zip(plant_names, plant_types, plant_codes, plant_units))
+
+    # Con cache, las plantas cuyas entradas no cambiaron reutilizan el bloque de solicitudes ya calculado
+    blocks = [None] * len(plants)
+    fingerprints = [None] * len(plants)
+    if catalogueCache is not None:
+        for plant_index, plant in enumerate(plants):
+            fingerprints[plant_index] = getPlantFingerprint(plant, catalogue, historicalMaintenances, unitCodes, first_year, number_of_years)
+            blocks[plant_index] = catalogueCache.getBlock(fingerprints[plant_index])
+    dirty = [plant_index for plant_index, block in enumerate(blocks) if block is None]
+    for plant_index in dirty:
+        blocks[plant_index] = getPlantRules(plants[plant_index], catalogue, historicalMaintenances, unitCodes, first_year)
+
+    faltando_catalogo = []
+    for plant_name, block in zip(plant_names, blocks):
+        for message in block['messages']:
+            print(message)
+        if block['missing']:
+            faltando_catalogo.append(plant_name)
+
+    expandPlantRules([blocks[plant_index] for plant_index in dirty], first_year, number_of_years)
+    if catalogueCache is not None:
+        for plant_index in dirty:
+            catalogueCache.setBlock(fingerprints[plant_index], blocks[plant_index])
+
+    # Los bloques se juntan en el orden de las plantas, igual que en una corrida completa
+    maintenanceSolicitations.newSolicitations(
+        [name for block in blocks for name in block['solicitation_names']],
+        concatenate_blocks(blocks, 'plant_codes', object),
+        concatenate_blocks(blocks, 'plant_types', object),
+        None,
+        concatenate_blocks(blocks, 'plant_names', object),
+        concatenate_blocks(blocks, 'plant_units', object),
+        concatenate_blocks(blocks, 'min_dates', 'datetime64[D]'),
+        concatenate_blocks(blocks, 'max_dates', 'datetime64[D]'),
+        concatenate_blocks(blocks, 'durations', object)
+    )
+    precedenceConstraints.addLines(
+        [name for block in blocks for name in block['prec_names']],
+        [name for block in blocks for name in block['prec_solicitation_names']],
+        concatenate_blocks(blocks, 'delay_mins', np.int64),
+        concatenate_blocks(blocks, 'delay_maxs', np.int64)
+    )
+    return faltando_catalogo
+
+def getPlantRules(plant, catalogue, historicalMaintenances, unitCodes, first_year):
+    # Una fila por (unidad, regla de catalogo) de la planta, con la fecha minima de la proxima mantencion
+    plant_name, plant_type, plant_code, number_units = plant
+    number_units = int(number_units)
+    first_date = datetime.datetime(first_year, 1, 1)
+    block = {
+        'plant': plant,
+        'messages': [],
+        'missing': False,
+        'rule_unit': [],
+        'rule_count_sol': [],
+        'rule_interval': [],
+        'rule_duration': [],
+        'rule_interval_min': [],
+        'rule_interval_max': [],
+        'rule_next_date': [],
+    }
+    catalogueRules = catalogue.getCatalogueRules(plant_name)
+    if catalogueRules is None:
+        block['messages'].append(f"Aviso: Regla de maintenimiento no fue encontrada para {plant_name}")
+        block['missing'] = True
+        return block
+    for unit in range(1, number_units + 1):
+        if unitCodes.hasUnitCodes(plant_name, plant_type):
+            if unitCodes.hasValidUnitCodes(plant_name, plant_type, number_units):
+                unit = unitCodes.getUnitCode(plant_name, plant_type, unit)
+            else:
+                block['messages'].append(f"Aviso: Planta {plant_name} esta en el archivo de codigos de unidades pero no lo numero de unidades no coincide")
+        for count_sol, catalogueRule in enumerate(catalogueRules, start=1):
+            latest_maintenance = historicalMaintenances.getLatestMaintenance(plant_name, unit, catalogueRule.duration)
+            if latest_maintenance == None:
+                next_date_min = first_date
+            else:
+                next_date_min = latest_maintenance.start_date + datetime.timedelta(days=catalogueRule.interval)
+            block['rule_unit'].append(unit)
+            block['rule_count_sol'].append(count_sol)
+            block['rule_interval'].append(catalogueRule.interval)
+            block['rule_duration'].append(catalogueRule.duration)
+            block['rule_interval_min'].append(catalogueRule.interval_min)
+            block['rule_interval_max'].append(catalogueRule.interval_max)
+            block['rule_next_date'].append(next_date_min)
+    return block
+
+def expandPlantRules(blocks, first_year, number_of_years):
+    # Repite cada regla dentro del horizonte, para todos los bloques a la vez, y deja en cada bloque sus
+    # solicitudes y lineas de precedencia
+    first_date = datetime.datetime(first_year, 1, 1)
+    rule_plant = np.repeat(np.arange(len(blocks)), [len(block['rule_unit']) for block in blocks])
+    plant_names = [block['plant'][0] for block in blocks]
+    plant_types = [block['plant'][1] for block in blocks]
+    plant_codes = [block['plant'][2] for block in blocks]
+    rule_unit = np.array([unit for block in blocks for unit in block['rule_unit']], dtype=object)
+    rule_count_sol = [count_sol for block in blocks for count_sol in block['rule_count_sol']]
+    rule_interval = np.array([interval for block in blocks for interval in block['rule_interval']], dtype=np.int64)
+    rule_duration = np.array([duration for block in blocks for duration in block['rule_duration']], dtype=object)
+    rule_interval_min = [interval for block in blocks for interval in block['rule_interval_min']]
+    rule_interval_max = [interval for block in blocks for interval in block['rule_interval_max']]
+    rule_next_date = np.array([date for block in blocks for date in block['rule_next_date']], dtype='datetime64[D]')
+    denominator = (rule_next_date - np.datetime64(first_date, 'D')).astype(np.int64) + rule_interval
+    if np.any(denominator == 0):
+        raise ZeroDivisionError("division by zero")
+    num_maint_horizon = 1 + np.trunc((number_of_years * 365 - rule_interval) / denominator).astype(np.int64)
+    num_maint_horizon = np.maximum(num_maint_horizon, 0)
+
+    # Una fila por repeticion dentro del horizonte
+    rule = np.repeat(np.arange(len(rule_plant)), num_maint_horizon)
+    count_prec = np.arange(len(rule)) - np.repeat(np.cumsum(num_maint_horizon) - num_maint_horizon, num_maint_horizon) + 1
+    plant = rule_plant[rule]
+    interval = rule_interval[rule]
+    next_dates = rule_next_date[rule] + (count_prec - 1) * interval
+    min_dates = ajust_dates_lower(next_dates)
+    max_dates = ajust_dates_upper(next_dates + interval + rule_duration[rule].astype(np.int64))
+    rule_suffix = pd.Series([
+        f"-{plant_names[plant_index]}-U{unit}" for plant_index, unit in zip(rule_plant.tolist(), rule_unit.tolist())
+    ], dtype=object)
+    rule_prefix = "CAT" + pd.Series(rule_count_sol, dtype=object).astype(str)
+    suffix = rule_suffix.iloc[rule].reset_index(drop=True)
+    prefix = rule_prefix.iloc[rule].reset_index(drop=True)
+    solicitation_names = (prefix + "-n" + pd.Series(count_prec).astype(str) + suffix).tolist()
+    plant_codes = np.array(plant_codes, dtype=object)[plant]
+    plant_types = np.array(plant_types, dtype=object)[plant]
+    plant_names = np.array(plant_names, dtype=object)[plant]
+    plant_units = rule_unit[rule]
+    durations = rule_duration[rule]
+
+    is_precedence = num_maint_horizon[rule] > 1
+    is_first = count_prec == 1
+    prec_plant = plant[is_precedence]
+    prec_names = (prefix + suffix)[is_precedence].tolist()
+    prec_solicitation_names = np.array(solicitation_names, dtype=object)[is_precedence].tolist()
+    delay_mins = np.where(is_first, 0, np.array(rule_interval_min, dtype=np.int64)[rule])[is_precedence]
+    delay_maxs = np.where(is_first, 0, np.array(rule_interval_max, dtype=np.int64)[rule])[is_precedence]
+
+    # Las filas quedan ordenadas por planta: cada bloque toma su tramo
+    bounds = np.searchsorted(plant, np.arange(len(blocks) + 1)).tolist()
+    prec_bounds = np.searchsorted(prec_plant, np.arange(len(blocks) + 1)).tolist()
+    for plant_index, block in enumerate(blocks):
+        start, end = bounds[plant_index], bounds[plant_index + 1]
+        block['solicitation_names'] = solicitation_names[start:end]
+        block['plant_codes'] = plant_codes[start:end]
+        block['plant_types'] = plant_types[start:end]
+        block['plant_names'] = plant_names[start:end]
+        block['plant_units'] = plant_units[start:end]
+        block['min_dates'] = min_dates[start:end]
+        block['max_dates'] = max_dates[start:end]
+        block['durations'] = durations[start:end]
+        start, end = prec_bounds[plant_index], prec_bounds[plant_index + 1]
+        block['prec_names'] = prec_names[start:end]
+        block['prec_solicitation_names'] = prec_solicitation_names[start:end]
+        block['delay_mins'] = delay_mins[start:end]
+        block['delay_maxs'] = delay_maxs[start:end]
+        for field in ('rule_unit', 'rule_count_sol', 'rule_interval', 'rule_duration', 'rule_interval_min', 'rule_interval_max', 'rule_next_date'):
+            del block[field]
+
+def concatenate_blocks(blocks, field, dtype):
+    return np.concatenate([np.empty(0, dtype=dtype)] + [block[field] for block in blocks])
+
+def getPlantFingerprint(plant, catalogue, historicalMaintenances, unitCodes, first_year, number_of_years):
+    # Huella de todo lo que determina las solicitudes de una planta: su fila, sus reglas de catalogo, sus codigos
+    # de unidad, el historico de cada una de sus unidades y el horizonte
+    plant_name, plant_type, plant_code, number_units = plant
+    catalogueRules = catalogue.getCatalogueRules(plant_name)
+    unit_codes = unitCodes.unit_codes.get((plant_name, plant_type))
+    history = []
+    if catalogueRules is not None:
+        for unit in range(1, int(number_units) + 1):
+            if unit_codes is not None and unitCodes.hasValidUnitCodes(plant_name, plant_type, int(number_units)):
+                unit = unitCodes.getUnitCode(plant_name, plant_type, unit)
+            history.append([
+                (maintenance.start_date, maintenance.duration)
+                for maintenance in historicalMaintenances.getMaintenances(plant_name, unit)
+            ])
+    content = repr((
+        plant,
+        None if catalogueRules is None else [(catalogueRule.interval, catalogueRule.duration) for catalogueRule in catalogueRules],
+        unit_codes,
+        history,
+        first_year,
+        number_of_years,
+    ))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+class CatalogueCache:
+    # Bloques de solicitudes y precedencias por planta guardados en disco: {huella: bloque}. Al guardar solo se
+    # conservan los bloques usados en la corrida actual.
+    def __init__(self, cache_file_path):
+        self.cache_file_path = cache_file_path
+        self.previous_blocks = {}
+        self.blocks = {}
+        if os.path.exists(cache_file_path):
+            with open(cache_file_path, 'rb') as f:
+                self.previous_blocks = pickle.load(f)
+
+    def getBlock(self, fingerprint):
+        block = self.previous_blocks.get(fingerprint)
+        if block is not None:
+            self.blocks[fingerprint] = block
+        return block
+
+    def setBlock(self, fingerprint, block):
+        self.blocks[fingerprint] = block
+
+    def save(self):
+        temporary_file_path = self.cache_file_path + '.tmp'
+        with open(temporary_file_path, 'wb') as f:
+            pickle.dump(self.blocks, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file_path, self.cache_file_path)
+
 def loadSiasamSolicitations(filename):
     solicitation = MaintenanceSolicitations()
     df_solicitations = pd.read_csv(filename)
@@ -115,121 +354,505 @@ class Plant:
 class HistoricalMaintenances:
     def __init__(self, historical_file_path):
         self.historical = {}
-        df_historical = pd.read_csv(historical_file_path)
-        for index, row in tqdm(df_historical.iterrows(), total=len(df_historical), desc="Processing"):
-            plant_name = row['Nome SIASAM'].split('-')[0]
-            plant_unit = int(row['Nome SIASAM'].split('U')[-1])
-            start_date = datetime.datetime.strptime(row['Saida'], '%m/%d/%Y')
-            duration = int(row['Duracao'])
-            self.saveMaintenance(plant_name, plant_unit, start_date, duration)
+        df_historical = pd.read_csv(historical_file_path, dtype={'Nome SIASAM': str, 'Saida': str})
+        siasam_names = df_historical['Nome SIASAM']
+        self.saveMaintenances(
+            siasam_names.str.split('-', n=1).str[0],
+            siasam_names.str.rsplit('U', n=1).str[-1].astype(int),
+            pd.to_datetime(df_historical['Saida'], format='%m/%d/%Y'),
+            df_historical['Duracao'].astype(int)
+        )
 
     def saveMaintenance(self, plant_name, plant_unit, start_date, duration):
-        maintenance = HistoricalMaintenance()
-        maintenance.plant_name = plant_name
-        maintenance.plant_unit = plant_unit
-        maintenance.start_date = start_date
-        maintenance.duration = duration
-        maintenance.plant_id = plant_name + "-" + str(plant_unit)
-        self.historical[maintenance.plant_id] = maintenance
+        maintenance = HistoricalMaintenance(plant_name + "-" + str(plant_unit), plant_name, plant_unit, start_date, duration)
+        if maintenance.plant_id not in self.historical:
+            self.historical[maintenance.plant_id] = MaintenanceTimeline()
+        self.historical[maintenance.plant_id].addMaintenance(maintenance)
+
+    def saveMaintenances(self, plant_names, plant_units, start_dates, durations):
+        # Carga en bloque: columnas ya parseadas, agrupadas por unidad en una sola pasada
+        plant_ids = plant_names + "-" + plant_units.astype(str)
+        plant_names = plant_names.tolist()
+        plant_units = plant_units.tolist()
+        start_dates = pd.DatetimeIndex(start_dates).to_pydatetime().tolist()
+        durations = durations.tolist()
+        for plant_id, positions in plant_ids.groupby(plant_ids, sort=False).indices.items():
+            if plant_id not in self.historical:
+                self.historical[plant_id] = MaintenanceTimeline()
+            self.historical[plant_id].addMaintenances([
+                HistoricalMaintenance(plant_id, plant_names[i], plant_units[i], start_dates[i], durations[i])
+                for i in positions
+            ])
+
+    def getMaintenances(self, plant_name, plant_unit):
+        plant_id = plant_name + "-" + str(plant_unit)
+        if plant_id not in self.historical:
+            return []
+        return self.historical[plant_id].getMaintenances()
 
     def getLatestMaintenance(self, plant_name, plant_unit, duration):
-        latestDate = datetime.datetime(1990, 1, 1)
-        latestIndex = None
         plant_id = plant_name + "-" + str(plant_unit)
-        for key in self.historical:
-            if key == plant_id and self.historical[key].start_date > latestDate and self.historical[key].duration >= duration*0.75 and self.historical[key].duration <= duration*1.25:
-                latestDate = self.historical[key].start_date
-                latestIndex = key
-        if latestIndex is not None:
-            return self.historical[latestIndex]
-        else:
+        if plant_id not in self.historical:
             return None
+        return self.historical[plant_id].getLatestMaintenance(
+            duration*0.75,
+            duration*1.25,
+            datetime.datetime(1990, 1, 1)
+        )
 
-class HistoricalMaintenance:
+class MaintenanceTimeline:
+    # Historico de una unidad ordenado por fecha de inicio. Para responder "ultimo mantenimiento con
+    # duracion en [min, max]" se indexan los registros por duracion y se guarda una sparse table con el
+    # registro mas reciente de cada rango, de modo que cada consulta es una busqueda binaria + O(1).
     def __init__(self):
-        self.plant_id = None
-        self.plant_name = None
-        self.plant_unit = None
-        self.start_date = None
-        self.duration = None
+        self.maintenances = []
+        self.durations = []
+        self.latest_table = []
+        self.is_indexed = True
+
+    def addMaintenance(self, maintenance):
+        self.maintenances.append(maintenance)
+        self.is_indexed = False
+
+    def addMaintenances(self, maintenances):
+        self.maintenances.extend(maintenances)
+        self.is_indexed = False
+
+    def getMaintenances(self):
+        if not self.is_indexed:
+            self.buildIndex()
+        return self.maintenances
+
+    def buildIndex(self):
+        self.maintenances.sort(key=lambda maintenance: maintenance.start_date)
+        by_duration = sorted(range(len(self.maintenances)), key=lambda i: self.maintenances[i].duration)
+        self.durations = [self.maintenances[i].duration for i in by_duration]
+        self.latest_table = [by_duration]
+        span = 1
+        while 2 * span <= len(by_duration):
+            previous = self.latest_table[-1]
+            self.latest_table.append([
+                self.latestOf(previous[i], previous[i + span])
+                for i in range(len(previous) - span)
+            ])
+            span *= 2
+        self.is_indexed = True
+
+    def latestOf(self, i, j):
+        # En empate de fechas prevalece el registro que aparece primero en el historico
+        if self.maintenances[j].start_date > self.maintenances[i].start_date:
+            return j
+        if self.maintenances[j].start_date == self.maintenances[i].start_date and j < i:
+            return j
+        return i
+
+    def getLatestMaintenance(self, min_duration, max_duration, after_date):
+        if not self.is_indexed:
+            self.buildIndex()
+        first = bisect.bisect_left(self.durations, min_duration)
+        last = bisect.bisect_right(self.durations, max_duration)
+        if first >= last:
+            return None
+        level = (last - first).bit_length() - 1
+        latest = self.latestOf(
+            self.latest_table[level][first],
+            self.latest_table[level][last - (1 << level)]
+        )
+        if self.maintenances[latest].start_date > after_date:
+            return self.maintenances[latest]
+        return None
+
+class HistoricalMaintenance:
+    def __init__(self, plant_id=None, plant_name=None, plant_unit=None, start_date=None, duration=None):
+        self.plant_id = plant_id
+        self.plant_name = plant_name
+        self.plant_unit = plant_unit
+        self.start_date = start_date
+        self.duration = duration
 
 class PlantTechs:
     def __init__(self, catalogue_file_path):
-        self.siasam = {}
         df_catalogue = pd.read_csv(catalogue_file_path)
-        for index, row in df_catalogue.iterrows():
-            name = row['Nombre']
-            self.siasam[name] = row['Tecnologia']
+        self.siasam = dict(zip(df_catalogue['Nombre'].tolist(), df_catalogue['Tecnologia'].tolist()))
+        self.tech_types = {}
+        self.buildCodeIndex()
+    def buildCodeIndex(self):
+        # Para cada subcadena de hasta 3 caracteres guarda el primer nombre (en orden del archivo) que la contiene,
+        # que es el que encontraria la busqueda lineal por codigo
+        self.code_index = {}
+        for key in self.siasam:
+            if not isinstance(key, str):
+                continue
+            for length in range(4):
+                for start in range(len(key) - length + 1):
+                    self.code_index.setdefault(key[start:start + length], key)
     def getTechType(self, plant_name):
-        if plant_name in self.siasam:
-            return self.siasam[plant_name]
+        if plant_name not in self.tech_types:
+            if plant_name in self.siasam:
+                self.tech_types[plant_name] = self.siasam[plant_name]
+            else:
+                code = ''.join(filter(str.isalpha, plant_name))[:3]
+                key = self.code_index.get(code)
+                self.tech_types[plant_name] = self.siasam[key] if key is not None else None
+        return self.tech_types[plant_name]
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+def is_integer_value(value):
+    return isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_))
+
+def split_date_ordinals(ordinals):
+    dates = (np.asarray(ordinals, dtype=np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+    months = dates.astype('datetime64[M]')
+    days = (dates - months.astype('datetime64[D]')).astype(np.int64) + 1
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    return days, months.astype(np.int64) % 12 + 1, years
+
+def write_csv_lines(output_file_path, header, columns, block_size=65536):
+    # Escribe el header y una linea por fila ("\n" + campos separados por coma), formateando y escribiendo
+    # bloques de filas de una vez en lugar de fila por fila
+    number_rows = len(columns[0]) if len(columns) > 0 else 0
+    with open(output_file_path, 'w') as f:
+        f.write(header)
+        for start in range(0, number_rows, block_size):
+            fields = []
+            for column in columns:
+                values = column[start:start + block_size]
+                if isinstance(values, np.ndarray):
+                    values = values.tolist()
+                fields.append(map(str, values))
+            f.write(''.join(['\n' + ','.join(line) for line in zip(*fields)]))
+
+def get_columnar_sidecar_path(csv_path):
+    return csv_path + '.columns'
+
+def save_columnar_sidecar(csv_path, columns):
+    # Copia binaria de un CSV ya escrito: un .npy por columna y un meta.json con el tamano y la fecha de
+    # modificacion del CSV, para que UpdateSiasam la use solo mientras el CSV no cambie. El meta.json se escribe al final.
+    csv_stat = os.stat(csv_path)
+    directory = get_columnar_sidecar_path(csv_path)
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    for name, values in columns.items():
+        np.save(os.path.join(directory, name + '.npy'), values, allow_pickle=False)
+    with open(meta_path, 'w') as f:
+        json.dump({
+            'csv_size': csv_stat.st_size,
+            'csv_mtime_ns': csv_stat.st_mtime_ns,
+            'rows': len(next(iter(columns.values()))),
+            'columns': list(columns),
+        }, f)
+
+def to_string_column(values):
+    # Solo columnas de texto puro; cualquier otro valor se deja al CSV
+    values = list(values)
+    if not all(isinstance(value, str) for value in values):
+        return None
+    return np.array(values, dtype=str)
+
+class TypedColumn:
+    # Columna de enteros guardada en un array tipado (8 bytes por fila). Si llega un valor que no es
+    # entero (None, float, str...) la columna pasa a guardar los objetos tal cual, para no cambiar lo que se escribe.
+    def __init__(self):
+        self.values = array.array('q')
+
+    def isTyped(self):
+        return isinstance(self.values, array.array)
+
+    def append(self, value):
+        if self.isTyped() and not is_integer_value(value):
+            self.values = self.values.tolist()
+        self.values.append(value)
+
+    def extend(self, values):
+        values = np.asarray(values)
+        if self.isTyped() and values.dtype == object and len(values) > 0:
+            inferred = np.array(values.tolist())
+            if inferred.dtype.kind in 'iu':
+                values = inferred
+        if self.isTyped() and values.dtype.kind in 'iu':
+            self.values.frombytes(values.astype(np.int64).tobytes())
         else:
-            code = ''.join(filter(str.isalpha, plant_name))[:3]
-            for key in self.siasam:
-                if code in key:
-                    return self.siasam[key]
-            return None
+            if self.isTyped():
+                self.values = self.values.tolist()
+            self.values.extend(values.tolist())
+
+    def take(self, rows):
+        if self.isTyped():
+            return np.frombuffer(self.values, dtype=np.int64)[rows]
+        return np.array(self.values, dtype=object)[rows]
+
+    def __getitem__(self, row):
+        return self.values[row]
+
+    def __setitem__(self, row, value):
+        if self.isTyped() and not is_integer_value(value):
+            self.values = self.values.tolist()
+        self.values[row] = value
+
+    def __len__(self):
+        return len(self.values)
+
+class DateColumn:
+    # Fechas guardadas como ordinales en un array tipado (4 bytes por fila), 0 = sin fecha
+    def __init__(self):
+        self.values = array.array('i')
+
+    def append(self, date):
+        self.values.append(0 if date is None else date.toordinal())
+
+    def extend(self, dates):
+        dates = np.asarray(dates)
+        if dates.dtype.kind == 'M':
+            ordinals = dates.astype('datetime64[D]').astype(np.int64) + EPOCH_ORDINAL
+            self.values.frombytes(ordinals.astype(np.int32).tobytes())
+        else:
+            for date in dates.tolist():
+                self.append(date)
+
+    def extendEmpty(self, number_rows):
+        self.values.frombytes(np.zeros(number_rows, dtype=np.int32).tobytes())
+
+    def ordinals(self):
+        return np.frombuffer(self.values, dtype=np.int32)
+
+    def __getitem__(self, row):
+        ordinal = self.values[row]
+        return None if ordinal == 0 else datetime.datetime.fromordinal(ordinal)
+
+    def __setitem__(self, row, date):
+        self.values[row] = 0 if date is None else date.toordinal()
+
+    def __len__(self):
+        return len(self.values)
+
+class ColumnRow:
+    # Vista de una fila de un contenedor por columnas: los atributos se leen y escriben en las columnas
+    __slots__ = ('columns', 'row')
+
+    def __init__(self, columns, row):
+        object.__setattr__(self, 'columns', columns)
+        object.__setattr__(self, 'row', row)
+
+    def __getattr__(self, name):
+        if name not in self.columns:
+            raise AttributeError(name)
+        return self.columns[name][self.row]
+
+    def __setattr__(self, name, value):
+        if name not in self.columns:
+            raise AttributeError(name)
+        self.columns[name][self.row] = value
+
+class ColumnRows(collections.abc.Mapping):
+    # Vista nombre -> fila, en el mismo orden que tendria un dict de objetos
+    def __init__(self, rows, columns, row_class):
+        self.rows = rows
+        self.columns = columns
+        self.row_class = row_class
+
+    def __getitem__(self, name):
+        return self.row_class(self.columns, self.rows[name])
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+class ColumnRowList(collections.abc.Sequence):
+    def __init__(self, columns, row_class):
+        self.columns = columns
+        self.row_class = row_class
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self.row_class(self.columns, i) for i in range(len(self))[row]]
+        if row < 0:
+            row += len(self)
+        if row < 0 or row >= len(self):
+            raise IndexError(row)
+        return self.row_class(self.columns, row)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
 
 class MaintenanceSolicitations:
     def __init__(self, load_from_file=None):
-        self.solicitations = {}
+        self.solicitation_rows = {}
+        self.columns = {
+            'solicitation_name': [],
+            'plant_code': TypedColumn(),
+            'plant_type': TypedColumn(),
+            'system_code': TypedColumn(),
+            'plant_name': [],
+            'plant_unit': TypedColumn(),
+            'min_date': DateColumn(),
+            'max_date': DateColumn(),
+            'duration': TypedColumn(),
+            'priority': TypedColumn(),
+            'preference_date': DateColumn(),
+            'fixed_date': TypedColumn(),
+        }
+        self.solicitations = ColumnRows(self.solicitation_rows, self.columns, MaintenanceSolicitationRow)
         self.header = "Nombre referencia,Codigo de la planta en el SDDP,Tipo de la central (0=Termica/1=Hidro Mayor/6=Hidro Menor),Nombre de la planta en el SDDP,Codigo de la unidad en el OptMain,Dia de la fecha minima,Mes de la fecha minima,Ano de la fecha minima,Dia de la fecha maxima,Mes de la fecha maxima,Ano de la fecha maxima,Duracion del mantenimiento"
         if load_from_file is not None:
             self.load_solicitations(load_from_file)
     def newSolicitation(self, solicitation_name, plant_code, plant_type, system_code, plant_name, plant_unit, min_date, max_date, duration, priority=0, preference_date=None, fixed_date=0):
-        solicitation = MaintenanceSolicitation(
-            solicitation_name = solicitation_name,
-            plant_code = plant_code,
-            plant_type = plant_type, 
-            system_code = system_code,
-            plant_name = plant_name,
-            plant_unit = plant_unit, 
-            min_date = min_date,
-            max_date = max_date, 
-            duration = duration,
-            priority = priority,
-            preference_date = preference_date,
-            fixed_date = fixed_date
-            )
-        self.solicitations[solicitation_name] = solicitation
-
-    def saveSolicitations(self, output_file_path):
-        with open(output_file_path, 'w') as f:
-            f.write(self.header)
-            for key in self.solicitations:
-                solicitation = self.solicitations[key]
-                text_line = f"\n{solicitation.solicitation_name},"
-                text_line += f"{solicitation.plant_code},"
-                text_line += f"{solicitation.plant_type},"
-                text_line += f"{solicitation.plant_name},"
-                text_line += f"{solicitation.plant_unit},"
-                text_line += f"{solicitation.min_date.day},"
-                text_line += f"{solicitation.min_date.month},"
-                text_line += f"{solicitation.min_date.year},"
-                text_line += f"{solicitation.max_date.day},"
-                text_line += f"{solicitation.max_date.month},"
-                text_line += f"{solicitation.max_date.year},"
-                text_line += f"{solicitation.duration}"
-                f.write(text_line)
+        values = {
+            'solicitation_name': solicitation_name,
+            'plant_code': plant_code,
+            'plant_type': plant_type,
+            'system_code': system_code,
+            'plant_name': plant_name,
+            'plant_unit': plant_unit,
+            'min_date': min_date,
+            'max_date': max_date,
+            'duration': duration,
+            'priority': priority,
+            'preference_date': preference_date,
+            'fixed_date': fixed_date,
+        }
+        if solicitation_name in self.solicitation_rows:
+            # Igual que en un dict: la solicitud conserva su posicion y toma los valores nuevos
+            row = self.solicitation_rows[solicitation_name]
+            for field, value in values.items():
+                self.columns[field][row] = value
+        else:
+            self.solicitation_rows[solicitation_name] = len(self.columns['solicitation_name'])
+            for field, value in values.items():
+                self.columns[field].append(value)
+
+    def newSolicitations(self, solicitation_names, plant_codes, plant_types, system_code, plant_names, plant_units, min_dates, max_dates, durations):
+        if len(set(solicitation_names)) < len(solicitation_names) or not self.solicitation_rows.keys().isdisjoint(solicitation_names):
+            # Hay nombres repetidos: se agregan uno a uno para mantener la semantica de newSolicitation
+            min_dates = min_dates.astype('datetime64[us]').astype(object)
+            max_dates = max_dates.astype('datetime64[us]').astype(object)
+            for i in range(len(solicitation_names)):
+                self.newSolicitation(
+                    solicitation_names[i],
+                    plant_codes[i],
+                    plant_types[i],
+                    system_code,
+                    plant_names[i],
+                    plant_units[i],
+                    min_dates[i],
+                    max_dates[i],
+                    durations[i]
+                )
+            return
+        first_row = len(self.columns['solicitation_name'])
+        number_rows = len(solicitation_names)
+        self.solicitation_rows.update(zip(solicitation_names, range(first_row, first_row + number_rows)))
+        self.columns['solicitation_name'].extend(solicitation_names)
+        self.columns['plant_code'].extend(plant_codes)
+        self.columns['plant_type'].extend(plant_types)
+        self.columns['system_code'].extend(np.full(number_rows, system_code, dtype=object))
+        self.columns['plant_name'].extend(plant_names)
+        self.columns['plant_unit'].extend(plant_units)
+        self.columns['min_date'].extend(min_dates)
+        self.columns['max_date'].extend(max_dates)
+        self.columns['duration'].extend(durations)
+        self.columns['priority'].extend(np.zeros(number_rows, dtype=np.int64))
+        self.columns['preference_date'].extendEmpty(number_rows)
+        self.columns['fixed_date'].extend(np.zeros(number_rows, dtype=np.int64))
+
+    def saveSolicitations(self, output_file_path, save_columns=False):
+        columns = self.columns
+        rows = np.fromiter(self.solicitation_rows.values(), dtype=np.int64, count=len(self.solicitation_rows))
+        min_days, min_months, min_years = split_date_ordinals(columns['min_date'].ordinals()[rows])
+        max_days, max_months, max_years = split_date_ordinals(columns['max_date'].ordinals()[rows])
+        write_csv_lines(output_file_path, self.header, [
+            np.array(columns['solicitation_name'], dtype=object)[rows],
+            columns['plant_code'].take(rows),
+            columns['plant_type'].take(rows),
+            np.array(columns['plant_name'], dtype=object)[rows],
+            columns['plant_unit'].take(rows),
+            min_days,
+            min_months,
+            min_years,
+            max_days,
+            max_months,
+            max_years,
+            columns['duration'].take(rows),
+        ])
+        if save_columns:
+            columns = self.getSolicitationColumns()
+            if columns is None:
+                print(f"Aviso: {output_file_path} tiene valores que no son texto o enteros, no se guarda la copia binaria")
+            else:
+                save_columnar_sidecar(output_file_path, columns)
+
+    def getSolicitationColumns(self):
+        # Columnas de lo que se escribe en el CSV, con fechas como ordinales, o None si alguna columna tiene
+        # valores que no son texto o enteros
+        columns = self.columns
+        rows = np.fromiter(self.solicitation_rows.values(), dtype=np.int64, count=len(self.solicitation_rows))
+        solicitation_names = to_string_column(np.array(columns['solicitation_name'], dtype=object)[rows])
+        plant_names = to_string_column(np.array(columns['plant_name'], dtype=object)[rows])
+        integer_columns = ('plant_code', 'plant_type', 'plant_unit', 'duration')
+        if solicitation_names is None or plant_names is None or not all(columns[field].isTyped() for field in integer_columns):
+            return None
+        return {
+            'solicitation_name': solicitation_names,
+            'plant_code': columns['plant_code'].take(rows),
+            'plant_type': columns['plant_type'].take(rows),
+            'plant_name': plant_names,
+            'plant_unit': columns['plant_unit'].take(rows),
+            'min_date': columns['min_date'].ordinals()[rows].astype(np.int64),
+            'max_date': columns['max_date'].ordinals()[rows].astype(np.int64),
+            'duration': columns['duration'].take(rows),
+        }
 
     def addSolicitation(self, solicitation):
-        self.solicitations[solicitation.solicitation_name] = solicitation
+        self.newSolicitation(
+            solicitation.solicitation_name,
+            solicitation.plant_code,
+            solicitation.plant_type,
+            solicitation.system_code,
+            solicitation.plant_name,
+            solicitation.plant_unit,
+            solicitation.min_date,
+            solicitation.max_date,
+            solicitation.duration,
+            solicitation.priority,
+            solicitation.preference_date,
+            solicitation.fixed_date
+        )
 
     def addSolicitations(self, solicitations):
         for solicitation in solicitations:
-            self.solicitations[solicitation.solicitation_name] = solicitation
+            self.addSolicitation(solicitation)
 
     def getPlantSolicitations(self, plant):
+        plant_names = self.columns['plant_name']
         plant_solicitations = []
-        for key in self.solicitations:
-            if self.solicitations[key].plant_name == plant.plant_name:
+        for key, row in self.solicitation_rows.items():
+            if plant_names[row] == plant.plant_name:
                 plant_solicitations.append(self.solicitations[key])
         return plant_solicitations
             
     def deleteSolicitation(self, solicitation_name):
-        del self.solicitations[solicitation_name]
+        del self.solicitation_rows[solicitation_name]
 
 class MaintenanceSolicitation:
+    __slots__ = (
+        'solicitation_name',
+        'plant_code',
+        'plant_type',
+        'system_code',
+        'plant_name',
+        'plant_unit',
+        'duration',
+        'min_date',
+        'max_date',
+        'priority',
+        'preference_date',
+        'fixed_date',
+    )
+
     def __init__(
             self,
             solicitation_name=None,
@@ -273,28 +896,35 @@ class MaintenanceSolicitation:
         out += "    Fixed Date: " + str(self.fixed_date) + "\n"
         return out
 
+class MaintenanceSolicitationRow(ColumnRow):
+    __slots__ = ()
+    __str__ = MaintenanceSolicitation.__str__
+
 class MaintenanceCatalogue:
     def __init__(self, catalogue_file_path, plantTechs):
         self.plantTechs = plantTechs
         self.catalogue_specific = {}
         self.catalogue_tech = {}
         df_catalogue = pd.read_csv(catalogue_file_path)
-        for index, row in df_catalogue.iterrows():
-            code = row['Codigo Tecnologia']
+        for code, interval, duration in zip(
+            df_catalogue['Codigo Tecnologia'].tolist(),
+            df_catalogue['Intervalo'].tolist(),
+            df_catalogue['Duracao'].tolist()
+        ):
             if '-' in code:
                 if code not in self.catalogue_specific:
                     self.catalogue_specific[code] = []
-                self.catalogue_specific[row['Codigo Tecnologia']].append(CatalogueRule(row['Intervalo'], row['Duracao']))
+                self.catalogue_specific[code].append(CatalogueRule(interval, duration))
             else:
                 if code not in self.catalogue_tech:
                     self.catalogue_tech[code] = []
-                self.catalogue_tech[code].append(CatalogueRule(row['Intervalo'], row['Duracao']))
+                self.catalogue_tech[code].append(CatalogueRule(interval, duration))
 
     def getCatalogueRules(self, plant_name):
-        tech_type = self.plantTechs.getTechType(plant_name)
         if plant_name[2:] in self.catalogue_specific:
             return self.catalogue_specific[plant_name[2:]]
-        elif tech_type in self.catalogue_tech:
+        tech_type = self.plantTechs.getTechType(plant_name)
+        if tech_type in self.catalogue_tech:
             return self.catalogue_tech[tech_type]
         else:
             return None
@@ -309,19 +939,55 @@ class CatalogueRule:
 class PrecedenceConstraints:
     def __init__(self):
         self.header = "!PrecName,SolName,DelayMin,DelayMax"
-        self.constraints = []
+        self.columns = {
+            'prec_name': [],
+            'sol_name': [],
+            'delay_min': TypedColumn(),
+            'delay_max': TypedColumn(),
+        }
+        self.constraints = ColumnRowList(self.columns, ColumnRow)
 
     def addLine(self, prec_name, sol_name, delay_min, delay_max):
-        constraint = PrecedenceConstraint(prec_name, sol_name, delay_min, delay_max)
-        self.constraints.append(constraint)
+        self.columns['prec_name'].append(prec_name)
+        self.columns['sol_name'].append(sol_name)
+        self.columns['delay_min'].append(delay_min)
+        self.columns['delay_max'].append(delay_max)
+
+    def addLines(self, prec_names, sol_names, delay_mins, delay_maxs):
+        self.columns['prec_name'].extend(prec_names)
+        self.columns['sol_name'].extend(sol_names)
+        self.columns['delay_min'].extend(delay_mins)
+        self.columns['delay_max'].extend(delay_maxs)
+
+    def saveConstraints(self, output_file_path, save_columns=False):
+        write_csv_lines(output_file_path, self.header, [
+            self.columns['prec_name'],
+            self.columns['sol_name'],
+            self.columns['delay_min'].values,
+            self.columns['delay_max'].values,
+        ])
+        if save_columns:
+            columns = self.getConstraintColumns()
+            if columns is None:
+                print(f"Aviso: {output_file_path} tiene valores que no son texto o enteros, no se guarda la copia binaria")
+            else:
+                save_columnar_sidecar(output_file_path, columns)
 
-    def saveConstraints(self, output_file_path):
-        with open(output_file_path, 'w') as f:
-            f.write(self.header)
-            for constraint in self.constraints:
-                f.write(f"\n{constraint.prec_name},{constraint.sol_name},{constraint.delay_min},{constraint.delay_max}")
+    def getConstraintColumns(self):
+        prec_names = to_string_column(self.columns['prec_name'])
+        sol_names = to_string_column(self.columns['sol_name'])
+        if prec_names is None or sol_names is None or not (self.columns['delay_min'].isTyped() and self.columns['delay_max'].isTyped()):
+            return None
+        rows = np.arange(len(prec_names))
+        return {
+            'prec_name': prec_names,
+            'sol_name': sol_names,
+            'delay_min': self.columns['delay_min'].take(rows),
+            'delay_max': self.columns['delay_max'].take(rows),
+        }
 
 class PrecedenceConstraint:
+    __slots__ = ('prec_name', 'sol_name', 'delay_min', 'delay_max')
 
     def __init__(self, prec_name, sol_name, delay_min, delay_max):
         self.prec_name = prec_name
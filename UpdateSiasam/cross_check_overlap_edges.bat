@@ -0,0 +1,3 @@
+@echo off
+python cross_check_overlap_edges.py
+pause
\ No newline at end of file
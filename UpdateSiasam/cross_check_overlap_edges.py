@@ -0,0 +1,17 @@
+from update_by_siasam_utils import *
+import sys
+
+NUMBER_INSTANCES = 5000
+SEED = 0
+
+# Compara los arcos de la linea de barrido (getOverlapEdges) con el doble loop original en instancias aleatorias
+if __name__ == '__main__':
+    mismatches = crossCheckOverlapEdges(NUMBER_INSTANCES, SEED)
+    for mismatch in mismatches:
+        print(f"Instancia {mismatch['instance']}:")
+        print(f"  SIASAM {mismatch['siasam_solicitations']}")
+        print(f"  catalogo {mismatch['original_solicitations']}")
+        print(f"  arcos {mismatch['edges']}")
+        print(f"  esperados {mismatch['expected_edges']}")
+    print(f"{NUMBER_INSTANCES - len(mismatches)} de {NUMBER_INSTANCES} instancias coinciden con el doble loop.")
+    sys.exit(1 if len(mismatches) > 0 else 0)
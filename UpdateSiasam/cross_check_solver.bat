@@ -0,0 +1,3 @@
+@echo off
+python cross_check_solver.py
+pause
\ No newline at end of file
@@ -0,0 +1,20 @@
+from update_by_siasam_utils import *
+import sys
+
+NUMBER_INSTANCES = 2000
+SEED = 0
+
+# Compara el solver de transporte con nx.max_flow_min_cost en instancias aleatorias. Falla solo si el flujo total
+# o el costo total no coinciden; los repartos distintos entre demandas con el mismo optimo solo se cuentan.
+if __name__ == '__main__':
+    mismatches = crossCheckTransportSolver(NUMBER_INSTANCES, SEED)
+    errors = [mismatch for mismatch in mismatches if not mismatch['split_only']]
+    for mismatch in errors:
+        print(f"Instancia {mismatch['instance']}: flujo {mismatch['flow']} (networkx {mismatch['networkx_flow']}), costo {mismatch['cost']} (networkx {mismatch['networkx_cost']})")
+        print(f"  flujo por demanda {mismatch['demand_flows']} (networkx {mismatch['networkx_demand_flows']})")
+        print(f"  ofertas {mismatch['supplies']}")
+        print(f"  demandas {mismatch['demands']}")
+        print(f"  arcos {mismatch['edges']}")
+    print(f"{NUMBER_INSTANCES - len(errors)} de {NUMBER_INSTANCES} instancias con el mismo flujo y costo total que networkx.")
+    print(f"{len(mismatches) - len(errors)} de ellas reparten el flujo entre demandas distinto que networkx.")
+    sys.exit(1 if len(errors) > 0 else 0)
@@ -1,51 +1,126 @@
 from update_by_siasam_utils import *
 import pandas as pd
-import networkx as nx
 import copy
 import os
 
 SYSTEM_CODE = 7
+NUM_PROCESSES = 1    # Procesos para resolver las unidades en paralelo (1 = sin paralelismo)
+ALLOCATION_SOLVER = 'networkx'    # 'networkx' (nx.max_flow_min_cost) o 'transport' (solver bipartito propio, mas rapido; solo garantiza el mismo flujo y costo total, no el mismo reparto, asi que optmcfg y optmprec pueden cambiar)
+ALLOCATION_CACHE = None    # Archivo con los resultados por unidad de la corrida anterior, p. ej. 'cache_alocacion.pkl' (None = sin cache)
+SIASAM_CHUNK_SIZE = None    # Filas de solicitudes_siasam.csv leidas por vez, p. ej. 50000 (None = archivo completo en memoria)
+RUN_REPORT = None    # Archivo JSON con tiempo y memoria por etapa y contadores por unidad, p. ej. 'reporte_corrida.json' (None = sin reporte)
+RUN_REPORT_MEMORY = False    # Mide tambien la memoria pico de cada etapa en el reporte (con tracemalloc, la corrida es mas lenta)
+# Solicitudes SIASAM muy similares pueden recibir un trato especial, aqui se configura los critérios de identificación de esas solicitudes.
+# Si la fecha de inicio y la duración de dos solicitudes están abajo de la tolerancia, se consideran la misma y no se duplican
+TOL_STARTING_DATE = 2    # Tolerancia en días para la proximidad de la fecha de inicio
+TOL_DURATION = 2         # Tolerancia en días para la proximidad de la duración
 
-# Leer archivo que va a correlacionar los nombres de las plantas en el SIASAM con el SDDP
-print('Cargando correspondencia de centrales...')
-generator_units = loadGeneratorUnits('01-04Feb-CorrespondenciaCentrales_SDDP_SIASAM.csv', SYSTEM_CODE)
-
-# Carga las solicitudes de mantenimiento originales
-print('Cargando solicitudes de mantenimiento originales...')
-originalSolicitations = MaintenanceSolicitations('solicitudes_minimas.csv')
-
-#print('Cargando solicitudes de mantenimiento fijas...')
-#fixedSolicitations = MaintenanceSolicitations('solicitudes_fijas.csv', fixed=True)
-
-irregularity_manager = IrregularityManager(     # Solicitudes SIASAM muy similares pueden recibir un trato especial, aqui se configura los critérios de identificación de esas solicitudes
-    tol_starting_date = 2, # Tolerancia en días para la proximidad de la fecha de inicio
-    tol_duration = 2,      # Tolerancia en días para la proximidad de la duración
-)                          # Si la fecha de inicio y la duración de dos solicitudes están abajo de la tolerancia, se consideran la misma y no se duplican
-
-# Adiciona las solicitudes de mantenimiento originales a las unidades
-for unit in generator_units:
-    unit.setIrregularityManager(irregularity_manager)
-    solicitations = originalSolicitations.getUnitSolicitations(unit)
-    for solicitation in solicitations:
-        unit.addOriginalSolicitation(solicitation)
-
-print('Cargando solicitudes de mantenimiento fijas...')
-df_siasam_fixed = pd.read_csv('solicitudes_siasam_fijas.csv', header=[0, 1])
-# Limpia char160
-str_cols = df_siasam_fixed.select_dtypes(include=['object']).columns
-df_siasam_fixed[str_cols] = df_siasam_fixed[str_cols].apply(lambda col: col.str.replace(r"[^\x20-\x7E]", "", regex=True))
-siasamCounterDict = {}
-for index, row in df_siasam_fixed.iterrows():
-    area = row.iloc[siasam_fijas_columns['Area']]
-    solicitationName = row.iloc[siasam_fijas_columns['SolicitationName']]
-    unitName = row.iloc[siasam_fijas_columns['UnitName']]
-    unitName = area + "-" + unitName
-    startDate = str_to_date(row.iloc[siasam_fijas_columns['StartDate']])
-    duration = row.iloc[siasam_fijas_columns['Duration']]
-    if solicitationName not in siasamCounterDict:
-        siasamCounterDict[solicitationName] = 0
+def loadSiasamInputs(input_dir='.', system_code=SYSTEM_CODE, siasam_chunk_size=SIASAM_CHUNK_SIZE):
+    # Entradas de UpdateSiasam que no dependen del catalogo ni de las tolerancias. Se pueden leer una sola vez
+    # para varias corridas: updateSiasam trabaja sobre una copia de las unidades. Con siasam_chunk_size, las
+    # solicitudes SIASAM no se cargan aqui: updateSiasam las lee por bloques (ver iterSiasamRows).
+    inputs = {}
+    # Leer archivo que va a correlacionar los nombres de las plantas en el SIASAM con el SDDP
+    print('Cargando correspondencia de centrales...')
+    inputs['generator_units'] = loadGeneratorUnits(os.path.join(input_dir, '01-04Feb-CorrespondenciaCentrales_SDDP_SIASAM.csv'), system_code)
+
+    print('Cargando solicitudes de mantenimiento fijas...')
+    df_siasam_fixed = pd.read_csv(os.path.join(input_dir, 'solicitudes_siasam_fijas.csv'), header=[0, 1])
+    # Limpia char160
+    inputs['df_siasam_fixed'] = clean_char160(df_siasam_fixed)
+
+    # Leer codigos del siasam que deben generar restricciones de asociacion
+    df_siasam_ass = pd.read_csv(os.path.join(input_dir, 'siasam_associacion.csv'))
+    vec_siasam_ass = []
+    for index, row in df_siasam_ass.iterrows():
+        vec_siasam_ass.append(row.iloc[0])
+    inputs['vec_siasam_ass'] = vec_siasam_ass
+
+    if siasam_chunk_size is not None:
+        inputs['siasam_file'] = os.path.join(input_dir, 'solicitudes_siasam.csv')
+        inputs['siasam_chunk_size'] = siasam_chunk_size
+        return inputs
+    print('Cargando solicitudes de mantenimiento del SIASAM...')
+    df_siasam = pd.read_csv(os.path.join(input_dir, 'solicitudes_siasam.csv'))
+    # Limpia char160
+    inputs['df_siasam'] = clean_char160(df_siasam)
+    return inputs
+
+def iterSiasamRows(inputs):
+    # Filas (index, row) de las solicitudes SIASAM, del DataFrame ya cargado o leyendo el archivo por bloques;
+    # en los dos casos las filas llegan en el orden del archivo y con los mismos valores
+    if 'df_siasam' in inputs:
+        yield from inputs['df_siasam'].iterrows()
+        return
+    print('Cargando solicitudes de mantenimiento del SIASAM por bloques...')
+    for df_siasam in read_siasam_chunks(inputs['siasam_file'], inputs['siasam_chunk_size']):
+        yield from df_siasam.iterrows()
+
+def updateSiasam(
+        input_dir='.',
+        output_dir='.',
+        system_code=SYSTEM_CODE,
+        originalSolicitations=None,
+        precedence_constraints=None,
+        num_processes=NUM_PROCESSES,
+        allocation_solver=ALLOCATION_SOLVER,
+        allocation_cache=ALLOCATION_CACHE,
+        tol_starting_date=TOL_STARTING_DATE,
+        tol_duration=TOL_DURATION,
+        inputs=None,
+        siasam_chunk_size=SIASAM_CHUNK_SIZE,
+        run_report=RUN_REPORT,
+        run_report_memory=RUN_REPORT_MEMORY
+    ):
+    # Las solicitudes de catalogo, sus precedencias y las entradas de loadSiasamInputs se pueden pasar ya cargadas
+    # (por ejemplo desde GenerateCatalogueSiasam en el mismo proceso); si no, se leen de input_dir.
+    # Devuelve un resumen con la cantidad de solicitudes e irregularidades. Si run_report tiene un nombre de
+    # archivo, el reporte de la corrida se guarda con ese nombre en output_dir.
+    report = RunReport(enabled=run_report is not None, trace_memory=run_report_memory)
+    report.setStage('input_loading')
+    if inputs is None:
+        inputs = loadSiasamInputs(input_dir, system_code, siasam_chunk_size)
+        generator_units = inputs['generator_units']
+    else:
+        generator_units = copy.deepcopy(inputs['generator_units'])
+    siasam_name_index = SiasamNameIndex(generator_units)
+
+    # Carga las solicitudes de mantenimiento originales
+    if originalSolicitations is None:
+        print('Cargando solicitudes de mantenimiento originales...')
+        originalSolicitations = MaintenanceSolicitations(os.path.join(input_dir, 'solicitudes_minimas.csv'), system_code=system_code)
+
+    #print('Cargando solicitudes de mantenimiento fijas...')
+    #fixedSolicitations = MaintenanceSolicitations('solicitudes_fijas.csv', fixed=True)
+
+    report.setStage('unit_attachment')
+
+    irregularity_manager = IrregularityManager(
+        tol_starting_date = tol_starting_date,
+        tol_duration = tol_duration,
+    )
+
+    # Adiciona las solicitudes de mantenimiento originales a las unidades
     for unit in generator_units:
-        if unit.hasSiasamName(unitName):
+        unit.setIrregularityManager(irregularity_manager)
+        solicitations = originalSolicitations.getUnitSolicitations(unit)
+        for solicitation in solicitations:
+            unit.addOriginalSolicitation(solicitation)
+
+    # Las irregularidades se detectan al agregar cada solicitud SIASAM a su unidad
+    report.setStage('irregularity_detection')
+    df_siasam_fixed = inputs['df_siasam_fixed']
+    siasamCounterDict = {}
+    for index, row in df_siasam_fixed.iterrows():
+        area = row.iloc[siasam_fijas_columns['Area']]
+        solicitationName = row.iloc[siasam_fijas_columns['SolicitationName']]
+        unitName = row.iloc[siasam_fijas_columns['UnitName']]
+        unitName = area + "-" + unitName
+        startDate = str_to_date(row.iloc[siasam_fijas_columns['StartDate']])
+        duration = row.iloc[siasam_fijas_columns['Duration']]
+        if solicitationName not in siasamCounterDict:
+            siasamCounterDict[solicitationName] = 0
+        for unit in siasam_name_index.getUnits(unitName):
             siasamCounterDict[solicitationName] += 1
             siasamFinalCode = solicitationName
             if siasamCounterDict[solicitationName] > 1:
@@ -66,35 +141,25 @@ for index, row in df_siasam_fixed.iterrows():
             )
             unit.addSiasamSolicitation(solicitation, False)
 
-# Leer codigos del siasam que deben generar restricciones de asociacion
-df_siasam_ass = pd.read_csv('siasam_associacion.csv')
-vec_siasam_ass = []
-for index, row in df_siasam_ass.iterrows():
-    vec_siasam_ass.append(row.iloc[0])
-
-# Carga las solicitudes de mantenimiento del SIASAM
-print('Cargando solicitudes de mantenimiento del SIASAM...')
-association_constraints = AssociationConstraints()
-df_siasam = pd.read_csv('solicitudes_siasam.csv')
-# Limpia char160
-str_cols = df_siasam.select_dtypes(include=['object']).columns
-df_siasam[str_cols] = df_siasam[str_cols].apply(lambda col: col.str.replace(r"[^\x20-\x7E]", "", regex=True))
-for index, row in df_siasam.iterrows():
-    siasam_name = row.iloc[siasam_columns['SiasamName']]
-    siasam_code = row.iloc[siasam_columns['SiasamCode']]
-    minDate = round_hour_to_date(row.iloc[siasam_columns['StartDate']])
-    maxDate = round_hour_to_date(row.iloc[siasam_columns['EndDate']])
-    duration = row.iloc[siasam_columns['Duration']]
-    equipType = row.iloc[siasam_columns['EquipType']]
-    area = siasam_code.split('-')[0]
-    siasam_name = area + "-" + siasam_name
-    isWholePlant = False
-    if equipType == 'CG' or row.iloc[siasam_columns['SiasamName']] in vec_siasam_ass:
-        isWholePlant = True
-        association_constraint = AssociationConstraint("assoc-" + siasam_code)
-    siasamCounter = 0
-    for unit in generator_units:
-        if unit.hasSiasamName(siasam_name):
+    vec_siasam_ass = inputs['vec_siasam_ass']
+
+    # Adiciona las solicitudes de mantenimiento del SIASAM a las unidades
+    association_constraints = AssociationConstraints()
+    for index, row in iterSiasamRows(inputs):
+        siasam_name = row.iloc[siasam_columns['SiasamName']]
+        siasam_code = row.iloc[siasam_columns['SiasamCode']]
+        minDate = round_hour_to_date(row.iloc[siasam_columns['StartDate']])
+        maxDate = round_hour_to_date(row.iloc[siasam_columns['EndDate']])
+        duration = row.iloc[siasam_columns['Duration']]
+        equipType = row.iloc[siasam_columns['EquipType']]
+        area = siasam_code.split('-')[0]
+        siasam_name = area + "-" + siasam_name
+        isWholePlant = False
+        if equipType == 'CG' or row.iloc[siasam_columns['SiasamName']] in vec_siasam_ass:
+            isWholePlant = True
+            association_constraint = AssociationConstraint("assoc-" + siasam_code)
+        siasamCounter = 0
+        for unit in siasam_name_index.getUnits(siasam_name):
             siasamCounter+=1
             siasamFinalCode = siasam_code
             if siasamCounter > 1:
@@ -117,97 +182,103 @@ for index, row in df_siasam.iterrows():
             status = unit.addSiasamSolicitation(solicitation, isWholePlant)
             if isWholePlant and status == 0:
                 association_constraint.addSolicitation(solicitation)
-    if isWholePlant:
-        association_constraints.addConstraint(association_constraint)
-# Durante el proceso de eliminación de solicitudes irregulares, algunas que se eliminan ya tienen restricciones de 
-# asociación definidas previamente, por lo que ahora limpiamos la casa antes de guardar las restricciones:
-association_constraints.filterBySolicitations(generator_units)    # Limpia las restricciones de asociación que no tienen solicitudes asociadas
-association_constraints.save('siasam_association_constraints.csv')
-irregularity_manager.saveReport('siasam_irregularities_overlap')
-irregularity_manager.saveReport('siasam_irregularities_duplicates', duplicates=True)
-irregularity_manager.saveReport('siasam_irregularities_fixed_duplicates', duplicates=True, fixed=True)
-irregularity_manager.saveReport('siasam_irregularities_fixed_overlap', duplicates=False, fixed=True)
-
-# ALGOTITMO DE ALOCACIÓN DE SOLICITUDES
-print('Optimizando alocación de solicitudes...')
-source = 1
-node_code_counter = 2
-for unit in generator_units:
-    for solicitation in unit.siasam_solicitations:
-        solicitation.setNodeCode(node_code_counter)
-        node_code_counter += 1
-    for solicitation in unit.original_solicitations:
-        solicitation.setNodeCode(node_code_counter)
-        node_code_counter += 1
-sink = node_code_counter
-erased_solicitations = []
-for unit in generator_units:
-    G = nx.DiGraph()
-    G.add_node(source)
-    G.add_node(sink)
-    for solicitation in unit.siasam_solicitations:
-        G.add_node(solicitation.node_code)
-        G.add_edge(source, solicitation.node_code, capacity=solicitation.duration)
-    for solicitation in unit.original_solicitations:
-        G.add_node(solicitation.node_code)
-        G.add_edge(solicitation.node_code, sink, capacity=solicitation.duration)
-    for solicitation_siasam in unit.siasam_solicitations:
-        for solicitation_original in unit.original_solicitations:
-            if (
-                (
-                    solicitation_siasam.min_date <= solicitation_original.min_date and
-                    solicitation_siasam.max_date >= solicitation_original.min_date
-                ) or (
-                    solicitation_siasam.min_date <= solicitation_original.max_date and
-                    solicitation_siasam.max_date >= solicitation_original.max_date
-                ) or (
-                    solicitation_siasam.min_date >= solicitation_original.min_date and
-                    solicitation_siasam.max_date <= solicitation_original.max_date
-                )
-            ):
-                cost = abs(solicitation_siasam.min_date.year - solicitation_original.min_date.year) + abs(solicitation_siasam.max_date.year - solicitation_original.max_date.year)
-                G.add_edge(solicitation_siasam.node_code, solicitation_original.node_code, weight = cost)
-    flow_dict = nx.max_flow_min_cost(G, source, sink)
-    for siasamSolicitation in unit.siasam_solicitations:
-        unit.addResultSolicitation(siasamSolicitation)
-    for originalSolicitation in unit.original_solicitations:
-        flow = flow_dict[originalSolicitation.node_code][sink]
-        if flow < originalSolicitation.duration:
-            leftover = originalSolicitation.duration - flow
-            solicitation = copy.deepcopy(originalSolicitation)
-            solicitation.duration = leftover
-            unit.addResultSolicitation(solicitation)
-        else:
-            erased_solicitations.append(originalSolicitation)
-print('Guardando resultados...')
-resultsSoliciations = MaintenanceSolicitations()
-for unit in generator_units:
-    resultsSoliciations.addSolicitations(unit.result_soliciations)
-resultsSoliciations.saveSolicitations('optmcfg.csv')
-
-if os.path.exists('precedencia_solicitudes_minimas.csv'):
-    precedence_constraints = PrecedenceConstraints()
-    precedence_constraints.load('precedencia_solicitudes_minimas.csv')
-    for precedence_constraint in precedence_constraints.constraints:
-        for i in range(len(precedence_constraint.solicitation_names) - 1, -1, -1):
-            if precedence_constraint.solicitation_names[i] in [erased_solicitation.solicitation_name for erased_solicitation in erased_solicitations]:
-                if i == 0 and len(precedence_constraint.solicitation_names) > 1:
-                    precedence_constraint.min_delays[i + 1] = 0
-                    precedence_constraint.max_delays[i + 1] = 0
-                elif i < len(precedence_constraint.solicitation_names) - 1:
-                    mean_delay_1 = (precedence_constraint.min_delays[i] + precedence_constraint.max_delays[i]) / 2
-                    mean_delay_2 = (precedence_constraint.min_delays[i + 1] + precedence_constraint.max_delays[i + 1]) / 2
-                    new_mean_delay = mean_delay_1 + mean_delay_2
-                    delta_delay = (precedence_constraint.max_delays[i] - precedence_constraint.min_delays[i]) / 2
-                    precedence_constraint.min_delays[i + 1] = int(new_mean_delay - delta_delay)
-                    precedence_constraint.max_delays[i + 1] = int(new_mean_delay + delta_delay)
-                del precedence_constraint.solicitation_names[i]
-                del precedence_constraint.min_delays[i]
-                del precedence_constraint.max_delays[i]
-    precedence_constraints.save('optmprec.csv')
-
-print('Proceso finalizado.')
+        if isWholePlant:
+            association_constraints.addConstraint(association_constraint)
+    # Durante el proceso de eliminación de solicitudes irregulares, algunas que se eliminan ya tienen restricciones de 
+    # asociación definidas previamente, por lo que ahora limpiamos la casa antes de guardar las restricciones:
+    association_constraints.filterBySolicitations(generator_units)    # Limpia las restricciones de asociación que no tienen solicitudes asociadas
+    report.setStage('output_writing')
+    association_constraints.save(os.path.join(output_dir, 'siasam_association_constraints.csv'))
+    irregularity_manager.saveReport(os.path.join(output_dir, 'siasam_irregularities_overlap'))
+    irregularity_manager.saveReport(os.path.join(output_dir, 'siasam_irregularities_duplicates'), duplicates=True)
+    irregularity_manager.saveReport(os.path.join(output_dir, 'siasam_irregularities_fixed_duplicates'), duplicates=True, fixed=True)
+    irregularity_manager.saveReport(os.path.join(output_dir, 'siasam_irregularities_fixed_overlap'), duplicates=False, fixed=True)
+
+    # ALGOTITMO DE ALOCACIÓN DE SOLICITUDES
+    print('Optimizando alocación de solicitudes...')
+    report.setStage('graph_construction')
+    source = 1
+    node_code_counter = 2
+    for unit in generator_units:
+        for solicitation in unit.siasam_solicitations:
+            solicitation.setNodeCode(node_code_counter)
+            node_code_counter += 1
+        for solicitation in unit.original_solicitations:
+            solicitation.setNodeCode(node_code_counter)
+            node_code_counter += 1
+    sink = node_code_counter
+    # Los problemas de cada unidad son independientes: se resuelven en paralelo y se juntan en el orden original
+    allocation_problems = [getAllocationProblem(unit) for unit in generator_units]
+    report.setStage('solver')
+    solve_stats = [] if report.enabled else None
+    if allocation_cache is None:
+        allocation_flows = solveAllocationProblems(allocation_problems, source, sink, num_processes, allocation_solver, solve_stats)
+    else:
+        # Solo se resuelven de nuevo las unidades cuyas solicitudes cambiaron desde la corrida anterior
+        allocation_cache = AllocationCache(allocation_cache)
+        allocation_flows, number_solved = solveAllocationProblemsCached(
+            allocation_problems,
+            [GeneratorUnits.getUnitKey(unit) for unit in generator_units],
+            allocation_cache, source, sink, num_processes, allocation_solver, solve_stats
+        )
+        allocation_cache.save()
+        print(f'Unidades resueltas: {number_solved} de {len(allocation_problems)}')
+    report.setStage('result_assembly')
+    erased_solicitations = []
+    kept_solicitations = 0
+    for unit, flows in zip(generator_units, allocation_flows):
+        for siasamSolicitation in unit.siasam_solicitations:
+            unit.addResultSolicitation(siasamSolicitation)
+        for originalSolicitation, flow in zip(unit.original_solicitations, flows):
+            if flow < originalSolicitation.duration:
+                leftover = originalSolicitation.duration - flow
+                solicitation = copy.deepcopy(originalSolicitation)
+                solicitation.duration = leftover
+                unit.addResultSolicitation(solicitation)
+                kept_solicitations += 1
+            else:
+                erased_solicitations.append(originalSolicitation)
+    print('Guardando resultados...')
+    resultsSoliciations = MaintenanceSolicitations()
+    for unit in generator_units:
+        resultsSoliciations.addSolicitations(unit.result_soliciations)
+    report.setStage('output_writing')
+    resultsSoliciations.saveSolicitations(os.path.join(output_dir, 'optmcfg.csv'))
 
+    report.setStage('precedence_rewiring')
+    if precedence_constraints is None and os.path.exists(os.path.join(input_dir, 'precedencia_solicitudes_minimas.csv')):
+        precedence_constraints = PrecedenceConstraints()
+        precedence_constraints.load(os.path.join(input_dir, 'precedencia_solicitudes_minimas.csv'))
+    if precedence_constraints is not None:
+        precedence_constraints.removeSolicitations(
+            erased_solicitation.solicitation_name for erased_solicitation in erased_solicitations
+        )
+        report.setStage('output_writing')
+        precedence_constraints.save(os.path.join(output_dir, 'optmprec.csv'))
 
+    report.finish()
+    summary = {
+        'catalogue_solicitations': sum(len(unit.original_solicitations) for unit in generator_units),
+        'siasam_solicitations': sum(len(unit.siasam_solicitations) for unit in generator_units),
+        'kept_solicitations': kept_solicitations,
+        'erased_solicitations': len(erased_solicitations),
+        'result_solicitations': len(resultsSoliciations.solicitations),
+        'irregularities_overlap': len(irregularity_manager.irregularities_overlap),
+        'irregularities_duplicates': len(irregularity_manager.irregularities_duplicates),
+        'irregularities_fixed_duplicates': len(irregularity_manager.irregularities_duplicates_fixed),
+        'irregularities_fixed_overlap': len(irregularity_manager.irregularities_overlap_fixed),
+    }
+    if report.enabled:
+        # Los contadores por unidad se calculan fuera de las etapas medidas
+        for unit, allocation_problem, flows, stats in zip(generator_units, allocation_problems, allocation_flows, solve_stats):
+            report.addUnit(unit, allocation_problem, flows, stats)
+        report.setCounters(summary)
+        report.save(os.path.join(output_dir, run_report))
+    print('Proceso finalizado.')
+    return summary
 
+def main():
+    updateSiasam()
 
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,16 @@
+import bisect
+import concurrent.futures
 import datetime
+import hashlib
+import heapq
+import json
+import networkx as nx
+import numpy as np
+import os
 import pandas as pd
+import pickle
+import time
+import tracemalloc
 
 siasam_name_columns = {
     'Code':0,
@@ -57,37 +68,633 @@ def calculate_intersection_days(start1, end1, start2, end2):
     delta = (intersection_end - intersection_start).days + 1
     return max(0, delta)
 
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+def split_date_ordinals(ordinals):
+    dates = (np.asarray(ordinals, dtype=np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+    months = dates.astype('datetime64[M]')
+    days = (dates - months.astype('datetime64[D]')).astype(np.int64) + 1
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    return days, months.astype(np.int64) % 12 + 1, years
+
+def write_csv_lines(output_file_path, header, columns, block_size=65536):
+    # Escribe el header y una linea por fila ("\n" + campos separados por coma), formateando y escribiendo
+    # bloques de filas de una vez en lugar de fila por fila
+    number_rows = len(columns[0]) if len(columns) > 0 else 0
+    with open(output_file_path, 'w') as f:
+        f.write(header)
+        for start in range(0, number_rows, block_size):
+            fields = []
+            for column in columns:
+                values = column[start:start + block_size]
+                if isinstance(values, np.ndarray):
+                    values = values.tolist()
+                fields.append(map(str, values))
+            f.write(''.join(['\n' + ','.join(line) for line in zip(*fields)]))
+
+def load_columnar_sidecar(csv_path, column_names):
+    # Columnas binarias guardadas por GenerateCatalogueSiasam junto al CSV (carpeta <csv>.columns). Devuelve None
+    # si no existen, si les falta alguna columna o si el CSV cambio despues de guardarlas (otro tamano o fecha de
+    # modificacion; el CSV no se lee). Ahorra el parseo del texto, el iterrows y la construccion de las fechas,
+    # pero quien las usa igual crea un objeto por fila.
+    directory = csv_path + '.columns'
+    meta_path = os.path.join(directory, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    csv_stat = os.stat(csv_path)
+    if (
+        not set(column_names).issubset(meta['columns']) or
+        meta.get('csv_size') != csv_stat.st_size or
+        meta.get('csv_mtime_ns') != csv_stat.st_mtime_ns
+    ):
+        return None
+    return {
+        name: np.load(os.path.join(directory, name + '.npy'), allow_pickle=False)
+        for name in column_names
+    }
+
+def clean_char160(df):
+    # Quita los caracteres no imprimibles (char160 y otros) de las columnas de texto
+    str_cols = df.select_dtypes(include=['object']).columns
+    df[str_cols] = df[str_cols].apply(lambda col: col.str.replace(r"[^\x20-\x7E]", "", regex=True))
+    return df
+
+def read_siasam_chunks(input_file_path, chunk_size):
+    # Lee solicitudes_siasam.csv de a chunk_size filas, ya limpias, sin tener el archivo entero en memoria. Las
+    # columnas de texto que se usan se leen siempre como texto, para que un bloque no cambie de tipo segun sus filas.
+    header = pd.read_csv(input_file_path, nrows=0).columns
+    text_columns = {header[siasam_columns[column]]: str for column in ['SiasamName', 'EquipType', 'SiasamCode', 'StartDate', 'EndDate']}
+    with pd.read_csv(input_file_path, chunksize=chunk_size, dtype=text_columns) as reader:
+        for chunk in reader:
+            yield clean_char160(chunk)
+
+def get_preference_window(solicitation):
+    # Dias (ordinales) ocupados desde la fecha de preferencia, como en calculate_intersection_days
+    start = solicitation.preference_date.toordinal()
+    end = (solicitation.preference_date + datetime.timedelta(days=solicitation.duration - 1)).toordinal()
+    return start, end
+
 def round_hour_to_date(date_string):
     return datetime.datetime.strptime(date_string, "%d/%m/%Y  %H:%M").date()
 
 def str_to_date(date_string):
     return datetime.datetime.strptime(date_string, "%d/%m/%Y").date()
 
+def normalize_siasam_name(siasam_name):
+    # "AR-ABCD-U1" -> "AR-ABCD01", como estan los nombres en el archivo de correspondencia
+    if len(siasam_name) > 7 and siasam_name[7:9] == "-U":
+        unit_num = siasam_name[9:]
+        if len(siasam_name[9:]) == 1:
+            unit_num = "0" + siasam_name[9:]
+        siasam_name = siasam_name[:7] + unit_num
+    return siasam_name
+
 def loadGeneratorUnits(siasam_name_file, system_code):
-    generator_units = []
+    generator_units = GeneratorUnits()
     df_siasam_name = pd.read_csv(siasam_name_file)
-    for index, row in df_siasam_name.iterrows():
-        unit_plant_name = row.iloc[siasam_name_columns['Name']]
-        unit_plant_code = row.iloc[siasam_name_columns['Code']]
-        unit_plant_type = row.iloc[siasam_name_columns['Tech']]
-        unit_siasam_name = row.iloc[siasam_name_columns['SiasamName']]
-        unit_num = row.iloc[siasam_name_columns['Unit']]
-        unit_is_defined = False
-        for unit_i in generator_units:
-            if (
-                unit_i.plant_type == sddp_tech_codes[unit_plant_type]
-                and unit_i.plant_code == unit_plant_code
-                and unit_i.unit == unit_num
-            ):
-                unit = unit_i
-                unit_is_defined = True
-                break
-        if not unit_is_defined:
-            unit = GeneratorUnit(system_code, unit_plant_name, unit_plant_code, sddp_tech_codes[unit_plant_type], unit_num)
-            generator_units.append(unit)
+    for unit_plant_name, unit_plant_code, unit_plant_type, unit_siasam_name, unit_num in zip(
+        df_siasam_name.iloc[:, siasam_name_columns['Name']].tolist(),
+        df_siasam_name.iloc[:, siasam_name_columns['Code']].tolist(),
+        df_siasam_name.iloc[:, siasam_name_columns['Tech']].tolist(),
+        df_siasam_name.iloc[:, siasam_name_columns['SiasamName']].tolist(),
+        df_siasam_name.iloc[:, siasam_name_columns['Unit']].tolist()
+    ):
+        unit_tech_code = sddp_tech_codes[unit_plant_type]
+        unit = generator_units.getUnit(unit_tech_code, unit_plant_code, unit_num)
+        if unit is None:
+            unit = GeneratorUnit(system_code, unit_plant_name, unit_plant_code, unit_tech_code, unit_num)
+            generator_units.addUnit(unit)
         unit.addSiasamName(unit_siasam_name)
     return generator_units
 
+def getAllocationProblem(unit):
+    # Datos minimos del grafo de una unidad, para no enviar la unidad entera a otro proceso
+    return (
+        [(solicitation.node_code, solicitation.duration, solicitation.min_date, solicitation.max_date) for solicitation in unit.siasam_solicitations],
+        [(solicitation.node_code, solicitation.duration, solicitation.min_date, solicitation.max_date) for solicitation in unit.original_solicitations],
+    )
+
+def overlaps(siasam_min_date, siasam_max_date, original_min_date, original_max_date):
+    return (
+        (
+            siasam_min_date <= original_min_date and
+            siasam_max_date >= original_min_date
+        ) or (
+            siasam_min_date <= original_max_date and
+            siasam_max_date >= original_max_date
+        ) or (
+            siasam_min_date >= original_min_date and
+            siasam_max_date <= original_max_date
+        )
+    )
+
+def getOverlapEdges(siasam_solicitations, original_solicitations):
+    # Arcos (solicitud SIASAM, solicitud de catalogo, costo) entre solicitudes que se solapan, en el orden del
+    # doble loop SIASAM x catalogo. Para intervalos bien formados (inicio <= fin) el criterio de solape equivale
+    # a que los intervalos se intersecten, y los pares se encuentran con una linea de barrido sobre las fechas
+    # de inicio; los intervalos invertidos, si los hay, se comparan uno a uno con el criterio original.
+    intervals = [
+        [(min_date.toordinal(), max_date.toordinal()) for node_code, duration, min_date, max_date in siasam_solicitations],
+        [(min_date.toordinal(), max_date.toordinal()) for node_code, duration, min_date, max_date in original_solicitations],
+    ]
+    pairs = []
+    events = []
+    inverted = [[], []]
+    for side in range(2):
+        for index, (start, end) in enumerate(intervals[side]):
+            if start <= end:
+                events.append((start, side, index))
+            else:
+                inverted[side].append(index)
+    events.sort()
+    active_ends = [[], []]
+    active = [set(), set()]
+    for start, side, index in events:
+        other = 1 - side
+        while active_ends[other] and active_ends[other][0][0] < start:
+            end, other_index = heapq.heappop(active_ends[other])
+            active[other].discard(other_index)
+        for other_index in active[other]:
+            pairs.append((index, other_index) if side == 0 else (other_index, index))
+        heapq.heappush(active_ends[side], (intervals[side][index][1], index))
+        active[side].add(index)
+    # Pares con algun intervalo invertido: cada SIASAM invertida contra todo el catalogo, y cada solicitud de
+    # catalogo invertida contra las SIASAM bien formadas (los pares con las dos invertidas ya se revisaron)
+    for i in inverted[0]:
+        siasam_start, siasam_end = intervals[0][i]
+        for j, (original_start, original_end) in enumerate(intervals[1]):
+            if overlaps(siasam_start, siasam_end, original_start, original_end):
+                pairs.append((i, j))
+    for j in inverted[1]:
+        original_start, original_end = intervals[1][j]
+        for i, (siasam_start, siasam_end) in enumerate(intervals[0]):
+            if siasam_start <= siasam_end and overlaps(siasam_start, siasam_end, original_start, original_end):
+                pairs.append((i, j))
+    pairs.sort()
+    edges = []
+    for i, j in pairs:
+        siasam_min_date, siasam_max_date = siasam_solicitations[i][2], siasam_solicitations[i][3]
+        original_min_date, original_max_date = original_solicitations[j][2], original_solicitations[j][3]
+        cost = abs(siasam_min_date.year - original_min_date.year) + abs(siasam_max_date.year - original_max_date.year)
+        edges.append((i, j, cost))
+    return edges
+
+def getOverlapEdgesDoubleLoop(siasam_solicitations, original_solicitations):
+    # Version original de getOverlapEdges (doble loop con el criterio de tres clausulas), usada como referencia
+    edges = []
+    for i, (siasam_node_code, siasam_duration, siasam_min_date, siasam_max_date) in enumerate(siasam_solicitations):
+        for j, (original_node_code, original_duration, original_min_date, original_max_date) in enumerate(original_solicitations):
+            if overlaps(siasam_min_date, siasam_max_date, original_min_date, original_max_date):
+                cost = abs(siasam_min_date.year - original_min_date.year) + abs(siasam_max_date.year - original_max_date.year)
+                edges.append((i, j, cost))
+    return edges
+
+def crossCheckOverlapEdges(number_instances=5000, seed=0, max_solicitations=12, max_days=1500, inverted_probability=0.1):
+    # Compara getOverlapEdges con el doble loop original en instancias aleatorias, con intervalos invertidos,
+    # de un dia y con extremos compartidos. Devuelve las instancias en que los arcos no coinciden.
+    rng = np.random.default_rng(seed)
+    first_date = datetime.date(2024, 1, 1)
+    mismatches = []
+    for instance in range(number_instances):
+        problem = []
+        for side in range(2):
+            solicitations = []
+            for k in range(int(rng.integers(0, max_solicitations + 1))):
+                start = int(rng.integers(0, max_days))
+                end = start + int(rng.integers(0, max_days // 4))
+                if rng.random() < inverted_probability:
+                    start, end = end + int(rng.integers(1, 30)), start
+                solicitations.append((k, end - start, first_date + datetime.timedelta(days=start), first_date + datetime.timedelta(days=end)))
+            problem.append(solicitations)
+        edges = getOverlapEdges(problem[0], problem[1])
+        expected_edges = getOverlapEdgesDoubleLoop(problem[0], problem[1])
+        if edges != expected_edges:
+            mismatches.append({
+                'instance': instance,
+                'siasam_solicitations': problem[0],
+                'original_solicitations': problem[1],
+                'edges': edges,
+                'expected_edges': expected_edges,
+            })
+    return mismatches
+
+def solveAllocationProblem(allocation_problem, source, sink, solver='networkx'):
+    return solveAllocationProblemWithEdges(allocation_problem, source, sink, solver)[0]
+
+def solveAllocationProblemWithEdges(allocation_problem, source, sink, solver='networkx'):
+    # Devuelve (flujo de cada solicitud de catalogo, cantidad de arcos SIASAM -> catalogo del grafo)
+    siasam_solicitations, original_solicitations = allocation_problem
+    if len(siasam_solicitations) == 0 or len(original_solicitations) == 0:
+        return [0 for solicitation in original_solicitations], 0
+    edges = getOverlapEdges(siasam_solicitations, original_solicitations)
+    if solver == 'networkx':
+        G = nx.DiGraph()
+        G.add_node(source)
+        G.add_node(sink)
+        for node_code, duration, min_date, max_date in siasam_solicitations:
+            G.add_node(node_code)
+            G.add_edge(source, node_code, capacity=duration)
+        for node_code, duration, min_date, max_date in original_solicitations:
+            G.add_node(node_code)
+            G.add_edge(node_code, sink, capacity=duration)
+        for i, j, cost in edges:
+            G.add_edge(siasam_solicitations[i][0], original_solicitations[j][0], weight = cost)
+        flow_dict = nx.max_flow_min_cost(G, source, sink)
+        return [flow_dict[node_code][sink] for node_code, duration, min_date, max_date in original_solicitations], len(edges)
+    edge_flows = solveTransportProblem(
+        [duration for node_code, duration, min_date, max_date in siasam_solicitations],
+        [duration for node_code, duration, min_date, max_date in original_solicitations],
+        edges
+    )
+    flows = [0 for solicitation in original_solicitations]
+    for (i, j, cost), edge_flow in zip(edges, edge_flows):
+        flows[j] += edge_flow
+    return flows, len(edges)
+
+def solveTransportProblem(supplies, demands, edges):
+    # Flujo maximo de costo minimo en el grafo bipartito fuente -> ofertas -> demandas -> sumidero, con arcos
+    # oferta -> demanda sin limite de capacidad. Caminos minimos sucesivos con potenciales; como los costos son
+    # enteros pequenos (diferencias de anos), cada camino minimo se busca con una cola de buckets (Dial).
+    # Devuelve el flujo de cada arco oferta -> demanda. Solo garantiza el mismo flujo total y costo total que
+    # nx.max_flow_min_cost: si hay varias soluciones optimas, el reparto entre demandas puede ser otro.
+    number_supplies = len(supplies)
+    number_demands = len(demands)
+    source = number_supplies + number_demands
+    sink = source + 1
+    number_nodes = sink + 1
+    residual_supply = [int(supply) for supply in supplies]
+    residual_demand = [int(demand) for demand in demands]
+    edge_from = [i for i, j, cost in edges]
+    edge_to = [number_supplies + j for i, j, cost in edges]
+    edge_cost = [int(cost) for i, j, cost in edges]
+    edge_flow = [0] * len(edges)
+    out_edges = [[] for node in range(number_supplies)]
+    in_edges = [[] for node in range(number_demands)]
+    for e in range(len(edges)):
+        out_edges[edge_from[e]].append(e)
+        in_edges[edge_to[e] - number_supplies].append(e)
+    potential = [0] * number_nodes
+    while True:
+        distance = [None] * number_nodes
+        settled = [False] * number_nodes
+        previous_edge = [None] * number_nodes
+        distance[source] = 0
+        buckets = [[source]]
+        current = 0
+        while current < len(buckets) and not settled[sink]:
+            bucket = buckets[current]
+            k = 0
+            while k < len(bucket):
+                node = bucket[k]
+                k += 1
+                if settled[node] or distance[node] != current:
+                    continue
+                settled[node] = True
+                if node == sink:
+                    break
+                arcs = []
+                if node == source:
+                    for i in range(number_supplies):
+                        if residual_supply[i] > 0:
+                            arcs.append((i, 0, -1))
+                elif node < number_supplies:
+                    for e in out_edges[node]:
+                        arcs.append((edge_to[e], edge_cost[e], e))
+                else:
+                    if residual_demand[node - number_supplies] > 0:
+                        arcs.append((sink, 0, -1))
+                    for e in in_edges[node - number_supplies]:
+                        if edge_flow[e] > 0:
+                            arcs.append((edge_from[e], -edge_cost[e], e))
+                for next_node, cost, e in arcs:
+                    if settled[next_node]:
+                        continue
+                    next_distance = current + cost + potential[node] - potential[next_node]
+                    if distance[next_node] is None or next_distance < distance[next_node]:
+                        distance[next_node] = next_distance
+                        previous_edge[next_node] = (node, e)
+                        while len(buckets) <= next_distance:
+                            buckets.append([])
+                        buckets[next_distance].append(next_node)
+            current += 1
+        if not settled[sink]:
+            break
+        sink_distance = distance[sink]
+        for node in range(number_nodes):
+            if distance[node] is None or distance[node] > sink_distance:
+                potential[node] += sink_distance
+            else:
+                potential[node] += distance[node]
+        # Capacidad del camino: oferta restante, demanda restante y flujos de los arcos recorridos al reves
+        path = []
+        node = sink
+        while node != source:
+            previous_node, e = previous_edge[node]
+            path.append((previous_node, node, e))
+            node = previous_node
+        amount = None
+        for previous_node, node, e in path:
+            if previous_node == source:
+                capacity = residual_supply[node]
+            elif node == sink:
+                capacity = residual_demand[previous_node - number_supplies]
+            elif previous_node >= number_supplies:
+                capacity = edge_flow[e]
+            else:
+                continue
+            amount = capacity if amount is None else min(amount, capacity)
+        for previous_node, node, e in path:
+            if previous_node == source:
+                residual_supply[node] -= amount
+            elif node == sink:
+                residual_demand[previous_node - number_supplies] -= amount
+            elif previous_node >= number_supplies:
+                edge_flow[e] -= amount
+            else:
+                edge_flow[e] += amount
+    return edge_flow
+
+def crossCheckTransportSolver(number_instances=1000, seed=0, max_nodes=8, max_capacity=40, max_cost=4):
+    # Compara solveTransportProblem con nx.max_flow_min_cost en instancias aleatorias. Devuelve las instancias
+    # en que no coinciden el flujo total, el costo total o el flujo de alguna demanda (arco demanda -> sumidero).
+    # Solo el flujo y el costo total son errores; con varias soluciones optimas el reparto entre demandas puede
+    # ser distinto (split_only = True), y como ese reparto decide que solicitudes de catalogo se eliminan,
+    # tambien se reporta.
+    rng = np.random.default_rng(seed)
+    mismatches = []
+    for instance in range(number_instances):
+        supplies = rng.integers(0, max_capacity + 1, size=rng.integers(1, max_nodes + 1)).tolist()
+        demands = rng.integers(0, max_capacity + 1, size=rng.integers(1, max_nodes + 1)).tolist()
+        edges = [
+            (i, j, int(rng.integers(0, max_cost + 1)))
+            for i in range(len(supplies)) for j in range(len(demands))
+            if rng.random() < 0.5
+        ]
+        edge_flows = solveTransportProblem(supplies, demands, edges)
+        flow = sum(edge_flows)
+        demand_flows = [0] * len(demands)
+        for edge_flow, (i, j, edge_cost) in zip(edge_flows, edges):
+            demand_flows[j] += edge_flow
+        cost = sum(edge_flow * edge_cost for edge_flow, (i, j, edge_cost) in zip(edge_flows, edges))
+        G = nx.DiGraph()
+        G.add_node('source')
+        G.add_node('sink')
+        for i, supply in enumerate(supplies):
+            G.add_edge('source', ('supply', i), capacity=supply)
+        for j, demand in enumerate(demands):
+            G.add_edge(('demand', j), 'sink', capacity=demand)
+        for i, j, edge_cost in edges:
+            G.add_edge(('supply', i), ('demand', j), weight=edge_cost)
+        flow_dict = nx.max_flow_min_cost(G, 'source', 'sink')
+        networkx_demand_flows = [flow_dict[('demand', j)]['sink'] for j in range(len(demands))]
+        networkx_flow = sum(networkx_demand_flows)
+        networkx_cost = nx.cost_of_flow(G, flow_dict)
+        if flow != networkx_flow or cost != networkx_cost or demand_flows != networkx_demand_flows:
+            mismatches.append({
+                'instance': instance,
+                'supplies': supplies,
+                'demands': demands,
+                'edges': edges,
+                'flow': flow,
+                'cost': cost,
+                'networkx_flow': networkx_flow,
+                'networkx_cost': networkx_cost,
+                'demand_flows': demand_flows,
+                'networkx_demand_flows': networkx_demand_flows,
+                'split_only': flow == networkx_flow and cost == networkx_cost,
+            })
+    return mismatches
+
+def solveAllocationProblemTimed(allocation_problem, source, sink, solver='networkx'):
+    start = time.perf_counter()
+    flows, number_overlap_edges = solveAllocationProblemWithEdges(allocation_problem, source, sink, solver)
+    return flows, (time.perf_counter() - start, number_overlap_edges)
+
+# Problemas de asignacion de la corrida paralela; cada proceso los recibe una sola vez al iniciar y las tareas
+# solo llevan el indice del problema
+pool_allocation_problems = {}
+
+def setPoolAllocationProblems(allocation_problems, source, sink, solver, timed):
+    pool_allocation_problems.update({
+        'allocation_problems': allocation_problems,
+        'source': source,
+        'sink': sink,
+        'solver': solver,
+        'solve': solveAllocationProblemTimed if timed else solveAllocationProblem,
+    })
+
+def solvePoolAllocationProblem(index):
+    return pool_allocation_problems['solve'](
+        pool_allocation_problems['allocation_problems'][index],
+        pool_allocation_problems['source'],
+        pool_allocation_problems['sink'],
+        pool_allocation_problems['solver']
+    )
+
+def solveAllocationProblems(allocation_problems, source, sink, num_processes=1, solver='networkx', solve_stats=None):
+    # Devuelve los flujos de cada problema en el mismo orden de entrada, con o sin procesos paralelos. Si se pasa
+    # la lista solve_stats, se le agrega (tiempo de solucion, arcos SIASAM -> catalogo) de cada problema, medidos
+    # en el proceso que lo resuelve.
+    solve = solveAllocationProblem if solve_stats is None else solveAllocationProblemTimed
+    if num_processes <= 1 or len(allocation_problems) < 2:
+        results = [solve(allocation_problem, source, sink, solver) for allocation_problem in allocation_problems]
+    else:
+        chunksize = max(1, len(allocation_problems) // (4 * num_processes))
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_processes,
+            initializer=setPoolAllocationProblems,
+            initargs=(allocation_problems, source, sink, solver, solve_stats is not None)
+        ) as executor:
+            results = list(executor.map(solvePoolAllocationProblem, range(len(allocation_problems)), chunksize=chunksize))
+    if solve_stats is None:
+        return results
+    solve_stats.extend(stats for flows, stats in results)
+    return [flows for flows, stats in results]
+
+def getAllocationFingerprint(allocation_problem, solver='networkx'):
+    # Huella de los datos que determinan el resultado de una unidad: duraciones y ventanas de las solicitudes
+    # SIASAM y de catalogo, en orden, y el solver. Los codigos de nodo solo numeran el grafo y no se incluyen.
+    siasam_solicitations, original_solicitations = allocation_problem
+    content = repr((
+        solver,
+        [solicitation[1:] for solicitation in siasam_solicitations],
+        [solicitation[1:] for solicitation in original_solicitations],
+    ))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+class AllocationCache:
+    # Resultados de asignacion por unidad guardados en disco: {clave de unidad: (huella, flujos)}. Al guardar
+    # solo se conservan las unidades usadas en la corrida actual.
+    def __init__(self, cache_file_path):
+        self.cache_file_path = cache_file_path
+        self.previous_entries = {}
+        self.entries = {}
+        if os.path.exists(cache_file_path):
+            with open(cache_file_path, 'rb') as f:
+                self.previous_entries = pickle.load(f)
+
+    def getFlows(self, unit_key, fingerprint):
+        entry = self.previous_entries.get(unit_key)
+        if entry is not None and entry[0] == fingerprint:
+            self.entries[unit_key] = entry
+            return entry[1]
+        return None
+
+    def setFlows(self, unit_key, fingerprint, flows):
+        self.entries[unit_key] = (fingerprint, flows)
+
+    def save(self):
+        temporary_file_path = self.cache_file_path + '.tmp'
+        with open(temporary_file_path, 'wb') as f:
+            pickle.dump(self.entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file_path, self.cache_file_path)
+
+def solveAllocationProblemsCached(allocation_problems, unit_keys, cache, source, sink, num_processes=1, solver='networkx', solve_stats=None):
+    # Como solveAllocationProblems, pero solo resuelve las unidades cuya huella no esta en la cache. En
+    # solve_stats las unidades tomadas de la cache quedan con None.
+    fingerprints = [getAllocationFingerprint(allocation_problem, solver) for allocation_problem in allocation_problems]
+    allocation_flows = [cache.getFlows(unit_key, fingerprint) for unit_key, fingerprint in zip(unit_keys, fingerprints)]
+    missing = [i for i, flows in enumerate(allocation_flows) if flows is None]
+    missing_solve_stats = None if solve_stats is None else []
+    solved_flows = solveAllocationProblems([allocation_problems[i] for i in missing], source, sink, num_processes, solver, missing_solve_stats)
+    for i, flows in zip(missing, solved_flows):
+        allocation_flows[i] = flows
+        cache.setFlows(unit_keys[i], fingerprints[i], flows)
+    if solve_stats is not None:
+        unit_solve_stats = [None] * len(allocation_problems)
+        for i, stats in zip(missing, missing_solve_stats):
+            unit_solve_stats[i] = stats
+        solve_stats.extend(unit_solve_stats)
+    return allocation_flows, len(missing)
+
+class RunReport:
+    # Tiempo y memoria pico de cada etapa de una corrida y contadores por unidad, para guardar como JSON. Las
+    # etapas se marcan con setStage: cada una termina cuando empieza la siguiente o al llamar finish, y una etapa
+    # que se repite acumula su tiempo. La memoria pico se mide con tracemalloc solo si trace_memory es True, porque
+    # hace mas lenta la corrida. Con enabled=False no se mide nada.
+    def __init__(self, enabled=True, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.units = []
+        self.counters = {}
+        self.current_stage = None
+        self.stage_start = None
+        self.started_tracing = False
+
+    def setStage(self, name):
+        if not self.enabled:
+            return
+        self.finish()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            tracemalloc.reset_peak()
+        self.current_stage = name
+        self.stage_start = time.perf_counter()
+
+    def finish(self):
+        if not self.enabled or self.current_stage is None:
+            return
+        seconds = time.perf_counter() - self.stage_start
+        stage = self.stages.setdefault(self.current_stage, {'seconds': 0.0, 'peak_memory_bytes': None})
+        stage['seconds'] += seconds
+        if self.trace_memory:
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            stage['peak_memory_bytes'] = max(stage['peak_memory_bytes'] or 0, peak_memory)
+        self.current_stage = None
+
+    def addUnit(self, unit, allocation_problem, flows, solve_stats):
+        # solve_stats es (tiempo de solucion, arcos SIASAM -> catalogo), o None si la unidad no se resolvio en esta
+        # corrida (cache de alocacion); en ese caso el tiempo y los arcos quedan vacios
+        if not self.enabled:
+            return
+        siasam_solicitations, original_solicitations = allocation_problem
+        solve_time, number_overlap_edges = (None, None) if solve_stats is None else solve_stats
+        number_edges = None
+        if number_overlap_edges is not None:
+            number_edges = len(siasam_solicitations) + len(original_solicitations) + number_overlap_edges
+        self.units.append({
+            'plant_type': unit.plant_type,
+            'plant_code': unit.plant_code,
+            'plant_name': unit.plant_name,
+            'unit': unit.unit,
+            'siasam_solicitations': len(siasam_solicitations),
+            'original_solicitations': len(original_solicitations),
+            'nodes': len(siasam_solicitations) + len(original_solicitations) + 2,
+            'edges': number_edges,
+            'siasam_duration': sum(solicitation[1] for solicitation in siasam_solicitations),
+            'original_duration': sum(solicitation[1] for solicitation in original_solicitations),
+            'flow': sum(flows),
+            'solve_seconds': solve_time,
+        })
+
+    def setCounters(self, counters):
+        if self.enabled:
+            self.counters.update(counters)
+
+    def save(self, output_file_path):
+        if not self.enabled:
+            return
+        self.finish()
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        report = {
+            'total_seconds': sum(stage['seconds'] for stage in self.stages.values()),
+            'stages': self.stages,
+            'counters': self.counters,
+            'units': self.units,
+        }
+        with open(output_file_path, 'w') as f:
+            json.dump(report, f, indent=2, default=int)
+
+class GeneratorUnits:
+    # Unidades en orden de insercion, con busqueda por (tipo, codigo de planta, unidad)
+    def __init__(self):
+        self.units = []
+        self.units_by_key = {}
+
+    @staticmethod
+    def getUnitKey(unit):
+        return (unit.plant_type, unit.plant_code, unit.unit)
+
+    def addUnit(self, unit):
+        self.units.append(unit)
+        self.units_by_key[self.getUnitKey(unit)] = unit
+
+    def getUnit(self, plant_type, plant_code, unit_num):
+        return self.units_by_key.get((plant_type, plant_code, unit_num))
+
+    def __iter__(self):
+        return iter(self.units)
+
+    def __len__(self):
+        return len(self.units)
+
+    def __getitem__(self, index):
+        return self.units[index]
+
+class SiasamNameIndex:
+    # Nombre SIASAM -> unidades que lo tienen, en el orden de generator_units. Equivale a recorrer todas las
+    # unidades preguntando hasSiasamName, con una sola busqueda por solicitud.
+    def __init__(self, generator_units):
+        self.units_by_name = {}
+        self.normalized_names = {}
+        for unit in generator_units:
+            for siasam_name in unit.siasam_names:
+                units = self.units_by_name.setdefault(siasam_name, [])
+                if len(units) == 0 or units[-1] is not unit:
+                    units.append(unit)
+
+    def getUnits(self, siasam_name):
+        if siasam_name not in self.normalized_names:
+            self.normalized_names[siasam_name] = normalize_siasam_name(siasam_name)
+        return self.units_by_name.get(self.normalized_names[siasam_name], [])
+
 class IrregularityManager:
     def __init__(self, tol_starting_date = 2, tol_duration = 2):
         self.tol_starting_date = tol_starting_date
@@ -157,6 +764,42 @@ class IrregularityManager:
         df = pd.DataFrame(data, columns=['Duplicate','Plant Name', 'Unit', 'Solicitation', 'Start Date', 'Duration'])
         df.to_csv(output_file_path + '.csv', index=False)
 
+class PreferenceWindowIndex:
+    # Ventanas de preferencia [inicio, fin] ordenadas por inicio. Como ninguna ventana guardada es mas larga que
+    # max_length, las que se intersectan con [start, end] empiezan entre start - max_length y end. Cada ventana
+    # tiene un numero de secuencia creciente, que es su orden en la lista de solicitudes de la unidad.
+    def __init__(self):
+        self.starts = []
+        self.windows = {}
+        self.max_length = 0
+        self.next_sequence = 0
+
+    def add(self, start, end, solicitation):
+        sequence = self.next_sequence
+        self.next_sequence += 1
+        if start <= end:
+            bisect.insort(self.starts, (start, sequence))
+            self.windows[sequence] = (start, end, solicitation)
+            self.max_length = max(self.max_length, end - start)
+        return sequence
+
+    def remove(self, sequence):
+        start, end, solicitation = self.windows.pop(sequence)
+        del self.starts[bisect.bisect_left(self.starts, (start, sequence))]
+
+    def getOverlapping(self, start, end):
+        if start > end:
+            return []
+        first = bisect.bisect_left(self.starts, (start - self.max_length, -1))
+        last = bisect.bisect_left(self.starts, (end + 1, -1))
+        overlapping = []
+        for window_start, sequence in self.starts[first:last]:
+            window_end = self.windows[sequence][1]
+            if window_end >= start:
+                overlapping.append((sequence, self.windows[sequence][2]))
+        overlapping.sort(key=lambda window: window[0])
+        return overlapping
+
 class GeneratorUnit:
     def __init__(self, plant_system, plant_name, plant_code, plant_type, unit):
         self.plant_system = plant_system
@@ -166,6 +809,7 @@ class GeneratorUnit:
         self.unit = unit
         self.siasam_names = []
         self.siasam_solicitations = []
+        self.siasam_windows = PreferenceWindowIndex()
         self.original_solicitations = []
         self.result_soliciations = []
         self.irregularity_manager = None
@@ -177,49 +821,38 @@ class GeneratorUnit:
         self.siasam_names.append(siasam_name)
 
     def hasSiasamName(self, siasam_name):
-        if len(siasam_name) > 7 and siasam_name[7:9] == "-U":
-            unit_num = siasam_name[9:]
-            if len(siasam_name[9:]) == 1:
-                unit_num = "0" + siasam_name[9:]
-            siasam_name = siasam_name[:7] + unit_num
-        return siasam_name in self.siasam_names
+        return normalize_siasam_name(siasam_name) in self.siasam_names
 
     def addSiasamSolicitation(self, solicitation, isWholePlant):
-        for isiasamSol in range(len(self.siasam_solicitations)):
-            siasamSol = self.siasam_solicitations[isiasamSol]
+        # Solo las solicitudes cuya ventana de preferencia se intersecta con la nueva pueden ser duplicadas o
+        # solapadas; se recorren en el mismo orden de self.siasam_solicitations
+        start, end = get_preference_window(solicitation)
+        for sequence, siasamSol in self.siasam_windows.getOverlapping(start, end):
             if (
                 abs((siasamSol.preference_date - solicitation.preference_date).days) <= self.irregularity_manager.tol_starting_date
                 and abs(siasamSol.duration - solicitation.duration) <= self.irregularity_manager.tol_duration
-                and calculate_intersection_days(
-                    siasamSol.preference_date,
-                    siasamSol.preference_date + datetime.timedelta(days=siasamSol.duration - 1),
-                    solicitation.preference_date,
-                    solicitation.preference_date + datetime.timedelta(days=solicitation.duration - 1)
-                    ) > 0
             ):
-                if self.siasam_solicitations[isiasamSol].fixed_date == 1:
+                if siasamSol.fixed_date == 1:
                     self.irregularity_manager.addIrregularityDuplicateFixed(siasamSol, solicitation)
                     return 1
                 elif isWholePlant:
-                    del self.siasam_solicitations[isiasamSol]
-                    self.siasam_solicitations.append(solicitation)
+                    self.siasam_solicitations.remove(siasamSol)
+                    self.siasam_windows.remove(sequence)
+                    self.appendSiasamSolicitation(solicitation, start, end)
                 self.irregularity_manager.addIrregularityDuplicate(siasamSol, solicitation)
                 return 0
-            elif (
-                calculate_intersection_days(
-                    siasamSol.preference_date,
-                    siasamSol.preference_date + datetime.timedelta(days=siasamSol.duration - 1),
-                    solicitation.preference_date,
-                    solicitation.preference_date + datetime.timedelta(days=solicitation.duration - 1)
-                    ) > 0
-            ):
-                if self.siasam_solicitations[isiasamSol].fixed_date == 1:
+            else:
+                if siasamSol.fixed_date == 1:
                     self.irregularity_manager.addIrregularityOverlapFixed(siasamSol, solicitation)
                     return 1
                 self.irregularity_manager.addIrregularityOverlap(siasamSol, solicitation)
-        self.siasam_solicitations.append(solicitation)
+        self.appendSiasamSolicitation(solicitation, start, end)
         return 0
 
+    def appendSiasamSolicitation(self, solicitation, start, end):
+        self.siasam_solicitations.append(solicitation)
+        self.siasam_windows.add(start, end, solicitation)
+
     def addOriginalSolicitation(self, solicitation):
         self.original_solicitations.append(solicitation)
 
@@ -248,42 +881,59 @@ class GeneratorUnit:
         return out
 
 class MaintenanceSolicitations:
-    def __init__(self, load_from_file=None, fixed=False):
+    def __init__(self, load_from_file=None, fixed=False, system_code=1):
         self.solicitations_name_count = {}
         self.solicitations = {}
+        self.solicitation_positions = {}
+        self.unit_solicitations = {}
         self.header = """$version=2,,,,,,,,,,,,,,,,,
 !Sname,code   ,type      ,system,Pname       ,Unit,min_date,min_date,min_date,max_date,max_date,max_date,Duration, Priority, Preference Date,Preference Date,Preference Date,Fixed Date
 !       ,       ,0=thermal ,          ,            ,,dd,mm      ,yy      ,dd,mm      ,yy      ,days,,dd,mm      ,yy,
 !       ,       ,1=hidro   ,          ,  ,,,        ,        ,,        ,        ,,,,,,"""
         if load_from_file is not None:
-            self.loadSolicitations(load_from_file, fixed=fixed)
+            self.loadSolicitations(load_from_file, fixed=fixed, system_code=system_code)
 
     def saveSolicitations(self, output_file_path):
-        with open(output_file_path, 'w') as f:
-            f.write(self.header)
-            for key in self.solicitations:
-                solicitation = self.solicitations[key]
-                text_line = f"\n{solicitation.solicitation_name},"
-                text_line += f"{solicitation.plant_code},"
-                text_line += f"{solicitation.plant_type},"
-                text_line += f"{solicitation.system_code},"
-                text_line += f"{solicitation.plant_name},"
-                text_line += f"{solicitation.plant_unit},"
-                text_line += f"{solicitation.min_date.day},"
-                text_line += f"{solicitation.min_date.month},"
-                text_line += f"{solicitation.min_date.year},"
-                text_line += f"{solicitation.max_date.day},"
-                text_line += f"{solicitation.max_date.month},"
-                text_line += f"{solicitation.max_date.year},"
-                text_line += f"{solicitation.duration},"
-                text_line += f"{solicitation.priority},"
-                text_line += f"{solicitation.preference_date.day}," if solicitation.preference_date is not None else "0,"
-                text_line += f"{solicitation.preference_date.month}," if solicitation.preference_date is not None else "0,"
-                text_line += f"{solicitation.preference_date.year}," if solicitation.preference_date is not None else "0,"
-                text_line += f"{solicitation.fixed_date}"
-                f.write(text_line)
-
-    def loadSolicitations(self, input_file_path, fixed=False):
+        solicitations = list(self.solicitations.values())
+        min_days, min_months, min_years = split_date_ordinals([solicitation.min_date.toordinal() for solicitation in solicitations])
+        max_days, max_months, max_years = split_date_ordinals([solicitation.max_date.toordinal() for solicitation in solicitations])
+        preference_ordinals = np.array([
+            0 if solicitation.preference_date is None else solicitation.preference_date.toordinal()
+            for solicitation in solicitations
+        ], dtype=np.int64)
+        preference_days, preference_months, preference_years = split_date_ordinals(preference_ordinals)
+        has_preference = preference_ordinals != 0
+        write_csv_lines(output_file_path, self.header, [
+            [solicitation.solicitation_name for solicitation in solicitations],
+            [solicitation.plant_code for solicitation in solicitations],
+            [solicitation.plant_type for solicitation in solicitations],
+            [solicitation.system_code for solicitation in solicitations],
+            [solicitation.plant_name for solicitation in solicitations],
+            [solicitation.plant_unit for solicitation in solicitations],
+            min_days,
+            min_months,
+            min_years,
+            max_days,
+            max_months,
+            max_years,
+            [solicitation.duration for solicitation in solicitations],
+            [solicitation.priority for solicitation in solicitations],
+            np.where(has_preference, preference_days, 0),
+            np.where(has_preference, preference_months, 0),
+            np.where(has_preference, preference_years, 0),
+            [solicitation.fixed_date for solicitation in solicitations],
+        ])
+
+    def loadSolicitations(self, input_file_path, fixed=False, system_code=1):
+        # Los archivos del catalogo no tienen sistema: las solicitudes toman el system_code del sistema que se procesa
+        if not fixed:
+            columns = load_columnar_sidecar(input_file_path, [
+                'solicitation_name', 'plant_code', 'plant_type', 'plant_name', 'plant_unit', 'min_date', 'max_date', 'duration'
+            ])
+            if columns is not None:
+                self.loadSolicitationColumns(columns, system_code)
+                return
+
         # Read the CSV file, skipping the first two header lines
         df = pd.read_csv(input_file_path)
 
@@ -305,7 +955,7 @@ class MaintenanceSolicitations:
                     solicitation_name=row.iloc[solicitudes_minimas_columns["SolicitationName"]],
                     plant_code=row.iloc[solicitudes_minimas_columns["PlantCode"]],
                     plant_type=int(row.iloc[solicitudes_minimas_columns["PlantTech"]]),
-                    system_code=1,
+                    system_code=system_code,
                     plant_name=row.iloc[solicitudes_minimas_columns["PlantName"]],
                     plant_unit=row.iloc[solicitudes_minimas_columns["UnitCode"]],
                     min_date=min_date,
@@ -325,7 +975,7 @@ class MaintenanceSolicitations:
                     solicitation_name=row.iloc[solicitudes_minimas_columns["SolicitationName"]],
                     plant_code=row.iloc[solicitudes_minimas_columns["PlantCode"]],
                     plant_type=int(row.iloc[solicitudes_minimas_columns["PlantTech"]]),
-                    system_code=1,
+                    system_code=system_code,
                     plant_name=row.iloc[solicitudes_minimas_columns["PlantName"]],
                     plant_unit=row.iloc[solicitudes_minimas_columns["UnitCode"]],
                     min_date=min_date,
@@ -338,27 +988,67 @@ class MaintenanceSolicitations:
 
             self.addSolicitation(sol)
 
+    def loadSolicitationColumns(self, columns, system_code=1):
+        # Misma carga que loadSolicitations para solicitudes no fijas, desde columnas con fechas como ordinales
+        dates = {}
+        for ordinal in np.unique(np.concatenate([columns['min_date'], columns['max_date']])).tolist():
+            dates[ordinal] = datetime.date.fromordinal(ordinal)
+        for solicitation_name, plant_code, plant_type, plant_name, plant_unit, min_date, max_date, duration in zip(
+            columns['solicitation_name'].tolist(),
+            columns['plant_code'].tolist(),
+            columns['plant_type'].tolist(),
+            columns['plant_name'].tolist(),
+            columns['plant_unit'].tolist(),
+            columns['min_date'].tolist(),
+            columns['max_date'].tolist(),
+            columns['duration'].tolist()
+        ):
+            self.addSolicitation(SolicitationInstance(
+                solicitation_name=solicitation_name,
+                plant_code=plant_code,
+                plant_type=plant_type,
+                system_code=system_code,
+                plant_name=plant_name,
+                plant_unit=plant_unit,
+                min_date=dates[min_date],
+                max_date=dates[max_date],
+                duration=duration,
+                priority=0,
+                preference_date=None,
+                fixed_date=0
+            ))
+
     def addSolicitation(self, solicitation):
         if solicitation.solicitation_name in self.solicitations_name_count:
             self.solicitations_name_count[solicitation.solicitation_name] += 1
             solicitation.solicitation_name += f"_{self.solicitations_name_count[solicitation.solicitation_name]}"
-        self.solicitations[solicitation.solicitation_name] = solicitation
+        name = solicitation.solicitation_name
+        previous = self.solicitations.get(name)
+        if previous is None:
+            self.solicitation_positions[name] = len(self.solicitation_positions)
+        else:
+            del self.unit_solicitations[self.getUnitKey(previous)][name]
+        self.solicitations[name] = solicitation
+        unit_key = self.getUnitKey(solicitation)
+        group = self.unit_solicitations.setdefault(unit_key, {})
+        group[name] = solicitation
+        if previous is not None and len(group) > 1:
+            # Una solicitud reemplazada conserva la posicion de su nombre en self.solicitations
+            self.unit_solicitations[unit_key] = dict(
+                sorted(group.items(), key=lambda item: self.solicitation_positions[item[0]])
+            )
+
+    @staticmethod
+    def getUnitKey(solicitation):
+        return (solicitation.plant_type, solicitation.plant_code, solicitation.system_code, solicitation.plant_unit)
 
     def addSolicitations(self, solicitations):
         for solicitation in solicitations:
             self.addSolicitation(solicitation)
 
     def getUnitSolicitations(self, unit):
-        unit_solicitations = []
-        for key in self.solicitations:
-            if (
-                self.solicitations[key].plant_type == unit.plant_type
-                and self.solicitations[key].plant_code == unit.plant_code
-                and self.solicitations[key].system_code == unit.plant_system
-                and self.solicitations[key].plant_unit == unit.unit
-            ):
-                unit_solicitations.append(self.solicitations[key])
-        return unit_solicitations
+        unit_key = (unit.plant_type, unit.plant_code, unit.plant_system, unit.unit)
+        return list(self.unit_solicitations.get(unit_key, {}).values())
     
 class SolicitationInstance:
     def __init__(
@@ -427,31 +1117,32 @@ class AssociationConstraints:
     def addConstraint(self, constraint):
         self.constraints.append(constraint)
     def save(self, output_file_path):
-        with open(output_file_path, 'w') as f:
-            f.write(self.header)
-            for constraint in self.constraints:
-                if len(constraint.solicitation) > 1:
-                    for solicitation in constraint.solicitation:
-                        f.write(f"\n{constraint.name},{solicitation.solicitation_name}")
+        constraints = [constraint for constraint in self.constraints if len(constraint.solicitation) > 1]
+        write_csv_lines(output_file_path, self.header, [
+            [constraint.name for constraint in constraints for solicitation in constraint.solicitation],
+            [solicitation.solicitation_name for constraint in constraints for solicitation in constraint.solicitation],
+        ])
     def filterBySolicitations(self,generator_units):
-        existing_solicitations = []
+        existing_solicitations = set()
         for unit in generator_units:
             for solicitation in unit.siasam_solicitations:
-                existing_solicitations.append(solicitation.solicitation_name)
+                existing_solicitations.add(solicitation.solicitation_name)
             for solicitation in unit.original_solicitations:
-                existing_solicitations.append(solicitation.solicitation_name)
-        for i in range(len(self.constraints)-1,-1,-1):
-            constraint = self.constraints[i]
-            for solicitation in constraint.solicitation:
-                if solicitation.solicitation_name not in existing_solicitations:
-                    del self.constraints[i]
+                existing_solicitations.add(solicitation.solicitation_name)
+        # Cada restriccion se elimina una sola vez si alguna de sus solicitudes ya no existe
+        self.constraints = [
+            constraint for constraint in self.constraints
+            if all(solicitation.solicitation_name in existing_solicitations for solicitation in constraint.solicitation)
+        ]
 
 class PrecedenceConstraint:
-    def __init__(self, name):
+    __slots__ = ('name', 'solicitation_names', 'min_delays', 'max_delays')
+
+    def __init__(self, name, solicitation_names=None, min_delays=None, max_delays=None):
         self.name = name
-        self.solicitation_names = []
-        self.min_delays = []
-        self.max_delays = []
+        self.solicitation_names = [] if solicitation_names is None else solicitation_names
+        self.min_delays = [] if min_delays is None else min_delays
+        self.max_delays = [] if max_delays is None else max_delays
     def addSolicitation(self, solicitation_name, min_delay, max_delay):
         self.solicitation_names.append(solicitation_name)
         self.min_delays.append(min_delay)
@@ -462,21 +1153,69 @@ class PrecedenceConstraints:
             self.constraints = []
             self.header = "!PrecName,SolName,DelayMin,DelayMax"
         def save(self, output_file_path):
-            with open(output_file_path, 'w') as f:
-                f.write(self.header)
-                for constraint in self.constraints:
-                    if len(constraint.solicitation_names) > 1:
-                        for i in range(len(constraint.solicitation_names)):
-                            f.write(f"\n{constraint.name},{constraint.solicitation_names[i]},{constraint.min_delays[i]},{constraint.max_delays[i]}")
+            constraints = [constraint for constraint in self.constraints if len(constraint.solicitation_names) > 1]
+            write_csv_lines(output_file_path, self.header, [
+                [constraint.name for constraint in constraints for solicitation_name in constraint.solicitation_names],
+                [solicitation_name for constraint in constraints for solicitation_name in constraint.solicitation_names],
+                [min_delay for constraint in constraints for min_delay in constraint.min_delays],
+                [max_delay for constraint in constraints for max_delay in constraint.max_delays],
+            ])
+        def removeSolicitations(self, erased_names):
+            # Recorre cada restriccion de atras hacia adelante: el retardo de una solicitud borrada se suma al de la
+            # siguiente solicitud que se conserva, y si la borrada es la primera, la siguiente queda sin retardo
+            erased_names = set(erased_names)
+            for constraint in self.constraints:
+                kept_names, kept_min_delays, kept_max_delays = [], [], []
+                for i in range(len(constraint.solicitation_names) - 1, -1, -1):
+                    if constraint.solicitation_names[i] not in erased_names:
+                        kept_names.append(constraint.solicitation_names[i])
+                        kept_min_delays.append(constraint.min_delays[i])
+                        kept_max_delays.append(constraint.max_delays[i])
+                    elif kept_names:
+                        if i == 0:
+                            kept_min_delays[-1] = 0
+                            kept_max_delays[-1] = 0
+                        else:
+                            mean_delay_1 = (constraint.min_delays[i] + constraint.max_delays[i]) / 2
+                            mean_delay_2 = (kept_min_delays[-1] + kept_max_delays[-1]) / 2
+                            new_mean_delay = mean_delay_1 + mean_delay_2
+                            delta_delay = (constraint.max_delays[i] - constraint.min_delays[i]) / 2
+                            kept_min_delays[-1] = int(new_mean_delay - delta_delay)
+                            kept_max_delays[-1] = int(new_mean_delay + delta_delay)
+                constraint.solicitation_names = kept_names[::-1]
+                constraint.min_delays = kept_min_delays[::-1]
+                constraint.max_delays = kept_max_delays[::-1]
         def load(self, input_file_path):
+            columns = load_columnar_sidecar(input_file_path, ['prec_name', 'sol_name', 'delay_min', 'delay_max'])
+            if columns is not None:
+                self.addConstraintRows(columns['prec_name'], columns['sol_name'], columns['delay_min'], columns['delay_max'])
+                return
             df = pd.read_csv(input_file_path)
-            for _, row in df.iterrows():
-                located = False
-                for constraint in self.constraints:
-                    if constraint.name == row["!PrecName"]:
-                        located = True
-                        constraint.addSolicitation(row["SolName"], row["DelayMin"], row["DelayMax"])
-                if not located:
-                    constraint = PrecedenceConstraint(row["!PrecName"])
-                    constraint.addSolicitation(row["SolName"], row["DelayMin"], row["DelayMax"])
-                    self.constraints.append(constraint)
+            # Mismos valores que entrega iterrows (df.values)
+            values = df.to_numpy()
+            self.addConstraintRows(*[
+                values[:, df.columns.get_loc(column)] for column in ["!PrecName", "SolName", "DelayMin", "DelayMax"]
+            ])
+        def addConstraintRows(self, names, solicitation_names, min_delays, max_delays):
+            # Agrupa las filas por nombre de precedencia; las filas sin nombre forman cada una su restriccion
+            codes, uniques = pd.factorize(names)
+            missing = codes == -1
+            codes[missing] = len(uniques) + np.arange(np.count_nonzero(missing))
+            number_constraints = len(uniques) + np.count_nonzero(missing)
+            # Las restricciones quedan en el orden de la primera fila de cada nombre, y sus filas en el orden del archivo
+            first_rows = np.full(number_constraints, len(codes))
+            np.minimum.at(first_rows, codes, np.arange(len(codes)))
+            rank = np.empty(number_constraints, dtype=np.int64)
+            rank[np.argsort(first_rows, kind='stable')] = np.arange(number_constraints)
+            rows = np.argsort(rank[codes], kind='stable')
+            bounds = np.cumsum(np.bincount(rank[codes], minlength=number_constraints))
+            names = names[rows].tolist()
+            solicitation_names = solicitation_names[rows].tolist()
+            min_delays = min_delays[rows].tolist()
+            max_delays = max_delays[rows].tolist()
+            start = 0
+            for end in bounds.tolist():
+                self.constraints.append(PrecedenceConstraint(
+                    names[start], solicitation_names[start:end], min_delays[start:end], max_delays[start:end]
+                ))
+                start = end
@@ -0,0 +1,138 @@
+import argparse
+import concurrent.futures
+import csv
+import os
+
+import pipeline
+import generate_catalogue
+import update_by_siasam
+
+SUMMARY_FIELDS = [
+    'system_code',
+    'siasam_dir',
+    'catalogue_solicitations',
+    'siasam_solicitations',
+    'kept_solicitations',
+    'erased_solicitations',
+    'result_solicitations',
+    'irregularities_overlap',
+    'irregularities_duplicates',
+    'irregularities_fixed_duplicates',
+    'irregularities_fixed_overlap',
+    'error',
+]
+
+# Catalogo generado una sola vez y compartido por todos los sistemas; cada proceso lo recibe al iniciar
+batch_catalogue = {}
+
+def setBatchCatalogue(catalogue):
+    batch_catalogue.update(catalogue)
+
+def runSystem(system):
+    # Cada sistema lee su correspondencia y sus solicitudes SIASAM y escribe en su propia carpeta. Un sistema que
+    # falla queda en la tabla con su error y no detiene a los demas.
+    try:
+        summary = pipeline.runSiasamUpdate(
+            batch_catalogue['maintenanceSolicitations'],
+            batch_catalogue['precedenceConstraints'],
+            system['siasam_dir'],
+            system['output_dir'],
+            system['system_code'],
+            1,
+            batch_catalogue['allocation_solver'],
+            None,
+            batch_catalogue['tol_starting_date'],
+            batch_catalogue['tol_duration']
+        )
+    except Exception as error:
+        return {'system_code': system['system_code'], 'siasam_dir': system['siasam_dir'], 'error': f"{type(error).__name__}: {error}"}
+    return {'system_code': system['system_code'], 'siasam_dir': system['siasam_dir'], **summary, 'error': ''}
+
+def runBatch(
+        systems,
+        catalogue_dir=pipeline.CATALOGUE_DIR,
+        output_dir='sistemas',
+        first_year=generate_catalogue.FIRST_YEAR,
+        number_of_years=generate_catalogue.NUMBER_OF_YEARS,
+        num_workers=1,
+        save_intermediate=False,
+        catalogue_cache=generate_catalogue.CATALOGUE_CACHE,
+        allocation_solver=update_by_siasam.ALLOCATION_SOLVER,
+        tol_starting_date=update_by_siasam.TOL_STARTING_DATE,
+        tol_duration=update_by_siasam.TOL_DURATION
+    ):
+    # systems: lista de (system_code, carpeta con las entradas de UpdateSiasam del sistema). El catalogo se genera
+    # una vez en output_dir y cada sistema escribe sus resultados en output_dir/sistema_<system_code>.
+    system_codes = [system_code for system_code, siasam_dir in systems]
+    if len(set(system_codes)) < len(system_codes):
+        raise ValueError(f"Codigos de sistema repetidos: {system_codes}")
+    os.makedirs(output_dir, exist_ok=True)
+    print('Generando catalogo...')
+    maintenanceSolicitations, precedenceConstraints, faltando_catalogo = generate_catalogue.generateCatalogue(
+        catalogue_dir, first_year, number_of_years, catalogue_cache
+    )
+    if save_intermediate:
+        generate_catalogue.saveCatalogue(maintenanceSolicitations, precedenceConstraints, faltando_catalogo, output_dir)
+    else:
+        generate_catalogue.saveFaltandoCatalogo(faltando_catalogo, os.path.join(output_dir, 'faltando_catalogo.csv'))
+    catalogue = {
+        'maintenanceSolicitations': maintenanceSolicitations,
+        'precedenceConstraints': precedenceConstraints,
+        'allocation_solver': allocation_solver,
+        'tol_starting_date': tol_starting_date,
+        'tol_duration': tol_duration,
+    }
+    systems = [
+        {'system_code': system_code, 'siasam_dir': siasam_dir, 'output_dir': os.path.join(output_dir, f"sistema_{system_code}")}
+        for system_code, siasam_dir in systems
+    ]
+    if num_workers <= 1 or len(systems) < 2:
+        setBatchCatalogue(catalogue)
+        summaries = [runSystem(system) for system in systems]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=setBatchCatalogue,
+            initargs=(catalogue,)
+        ) as executor:
+            summaries = list(executor.map(runSystem, systems))
+    with open(os.path.join(output_dir, 'resumen_sistemas.csv'), 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS, restval='')
+        writer.writeheader()
+        writer.writerows(summaries)
+    return summaries
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera el catalogo una vez y lo concilia con el SIASAM de varios sistemas.')
+    parser.add_argument('--system', nargs=2, action='append', required=True, metavar=('SYSTEM_CODE', 'SIASAM_DIR'),
+                        help='Codigo del sistema y carpeta con sus entradas de UpdateSiasam; se repite por cada sistema')
+    parser.add_argument('--catalogue-dir', default=pipeline.CATALOGUE_DIR, help='Carpeta con las entradas de GenerateCatalogueSiasam')
+    parser.add_argument('--output-dir', default='sistemas', help='Carpeta con el catalogo, una subcarpeta por sistema y la tabla resumen')
+    parser.add_argument('--first-year', type=int, default=generate_catalogue.FIRST_YEAR)
+    parser.add_argument('--number-of-years', type=int, default=generate_catalogue.NUMBER_OF_YEARS)
+    parser.add_argument('--num-workers', type=int, default=1, help='Sistemas corriendo al mismo tiempo')
+    parser.add_argument('--save-intermediate', action='store_true', help='Escribe tambien solicitudes_minimas.csv y precedencia_solicitudes_minimas.csv')
+    parser.add_argument('--catalogue-cache', default=generate_catalogue.CATALOGUE_CACHE, help='Archivo de cache por planta del catalogo')
+    parser.add_argument('--allocation-solver', choices=['transport', 'networkx'], default=update_by_siasam.ALLOCATION_SOLVER)
+    parser.add_argument('--tol-starting-date', type=int, default=update_by_siasam.TOL_STARTING_DATE)
+    parser.add_argument('--tol-duration', type=int, default=update_by_siasam.TOL_DURATION)
+    args = parser.parse_args()
+    systems = [(int(system_code), siasam_dir) for system_code, siasam_dir in args.system]
+    summaries = runBatch(
+        systems,
+        args.catalogue_dir,
+        args.output_dir,
+        args.first_year,
+        args.number_of_years,
+        args.num_workers,
+        args.save_intermediate,
+        args.catalogue_cache,
+        args.allocation_solver,
+        args.tol_starting_date,
+        args.tol_duration
+    )
+    for summary in summaries:
+        print(', '.join(f"{field}={summary.get(field, '')}" for field in SUMMARY_FIELDS))
+
+if __name__ == '__main__':
+    main()
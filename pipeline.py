@@ -0,0 +1,166 @@
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CATALOGUE_DIR = os.path.join(ROOT_DIR, 'GenerateCatalogueSiasam')
+SIASAM_DIR = os.path.join(ROOT_DIR, 'UpdateSiasam')
+sys.path.insert(0, CATALOGUE_DIR)
+sys.path.insert(0, SIASAM_DIR)
+
+import generate_catalogue
+import update_by_siasam
+import update_by_siasam_utils
+
+def toSiasamSolicitations(maintenanceSolicitations, system_code):
+    # Pasa las solicitudes de GenerateCatalogueSiasam a UpdateSiasam sin escribir solicitudes_minimas.csv. Si
+    # alguna columna no se puede pasar directamente, se hace el mismo viaje por CSV que entre los dos scripts.
+    columns = maintenanceSolicitations.getSolicitationColumns()
+    originalSolicitations = update_by_siasam_utils.MaintenanceSolicitations()
+    if columns is not None:
+        originalSolicitations.loadSolicitationColumns(columns, system_code)
+        return originalSolicitations
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        file_path = os.path.join(temporary_dir, 'solicitudes_minimas.csv')
+        maintenanceSolicitations.saveSolicitations(file_path)
+        originalSolicitations.loadSolicitations(file_path, system_code=system_code)
+    return originalSolicitations
+
+def toSiasamPrecedenceConstraints(precedenceConstraints):
+    columns = precedenceConstraints.getConstraintColumns()
+    precedence_constraints = update_by_siasam_utils.PrecedenceConstraints()
+    if columns is not None:
+        precedence_constraints.addConstraintRows(columns['prec_name'], columns['sol_name'], columns['delay_min'], columns['delay_max'])
+        return precedence_constraints
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        file_path = os.path.join(temporary_dir, 'precedencia_solicitudes_minimas.csv')
+        precedenceConstraints.saveConstraints(file_path)
+        precedence_constraints.load(file_path)
+    return precedence_constraints
+
+def runPipeline(
+        catalogue_dir=CATALOGUE_DIR,
+        siasam_dir=SIASAM_DIR,
+        output_dir=SIASAM_DIR,
+        first_year=generate_catalogue.FIRST_YEAR,
+        number_of_years=generate_catalogue.NUMBER_OF_YEARS,
+        system_code=update_by_siasam.SYSTEM_CODE,
+        save_intermediate=False,
+        catalogue_cache=generate_catalogue.CATALOGUE_CACHE,
+        num_processes=update_by_siasam.NUM_PROCESSES,
+        allocation_solver=update_by_siasam.ALLOCATION_SOLVER,
+        allocation_cache=update_by_siasam.ALLOCATION_CACHE,
+        tol_starting_date=update_by_siasam.TOL_STARTING_DATE,
+        tol_duration=update_by_siasam.TOL_DURATION,
+        catalogue_inputs=None,
+        siasam_inputs=None,
+        siasam_chunk_size=update_by_siasam.SIASAM_CHUNK_SIZE,
+        run_report=update_by_siasam.RUN_REPORT,
+        run_report_memory=update_by_siasam.RUN_REPORT_MEMORY
+    ):
+    # GenerateCatalogueSiasam y UpdateSiasam en un solo proceso: las solicitudes y precedencias del catalogo pasan
+    # en memoria y los archivos intermedios solo se escriben si save_intermediate es True. Las entradas ya leidas
+    # (loadCatalogueInputs, loadSiasamInputs) se pueden pasar para no volver a leerlas. Devuelve un resumen.
+    os.makedirs(output_dir, exist_ok=True)
+    print('Generando catalogo...')
+    maintenanceSolicitations, precedenceConstraints, faltando_catalogo = generate_catalogue.generateCatalogue(
+        catalogue_dir, first_year, number_of_years, catalogue_cache, catalogue_inputs
+    )
+    if save_intermediate:
+        generate_catalogue.saveCatalogue(maintenanceSolicitations, precedenceConstraints, faltando_catalogo, output_dir)
+    else:
+        generate_catalogue.saveFaltandoCatalogo(faltando_catalogo, os.path.join(output_dir, 'faltando_catalogo.csv'))
+    summary = runSiasamUpdate(
+        maintenanceSolicitations,
+        precedenceConstraints,
+        siasam_dir,
+        output_dir,
+        system_code,
+        num_processes,
+        allocation_solver,
+        allocation_cache,
+        tol_starting_date,
+        tol_duration,
+        siasam_inputs,
+        siasam_chunk_size,
+        run_report,
+        run_report_memory
+    )
+    return {'missing_catalogue_plants': len(faltando_catalogo), **summary}
+
+def runSiasamUpdate(
+        maintenanceSolicitations,
+        precedenceConstraints,
+        siasam_dir=SIASAM_DIR,
+        output_dir=SIASAM_DIR,
+        system_code=update_by_siasam.SYSTEM_CODE,
+        num_processes=update_by_siasam.NUM_PROCESSES,
+        allocation_solver=update_by_siasam.ALLOCATION_SOLVER,
+        allocation_cache=update_by_siasam.ALLOCATION_CACHE,
+        tol_starting_date=update_by_siasam.TOL_STARTING_DATE,
+        tol_duration=update_by_siasam.TOL_DURATION,
+        siasam_inputs=None,
+        siasam_chunk_size=update_by_siasam.SIASAM_CHUNK_SIZE,
+        run_report=update_by_siasam.RUN_REPORT,
+        run_report_memory=update_by_siasam.RUN_REPORT_MEMORY
+    ):
+    # UpdateSiasam sobre un catalogo ya generado, que no se modifica: se puede usar para varios sistemas
+    os.makedirs(output_dir, exist_ok=True)
+    return update_by_siasam.updateSiasam(
+        siasam_dir,
+        output_dir,
+        system_code,
+        toSiasamSolicitations(maintenanceSolicitations, system_code),
+        toSiasamPrecedenceConstraints(precedenceConstraints),
+        num_processes,
+        allocation_solver,
+        allocation_cache,
+        tol_starting_date,
+        tol_duration,
+        siasam_inputs,
+        siasam_chunk_size,
+        run_report,
+        run_report_memory
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera el catalogo de solicitudes y lo concilia con el SIASAM en un solo proceso.')
+    parser.add_argument('--catalogue-dir', default=CATALOGUE_DIR, help='Carpeta con las entradas de GenerateCatalogueSiasam')
+    parser.add_argument('--siasam-dir', default=SIASAM_DIR, help='Carpeta con las entradas de UpdateSiasam')
+    parser.add_argument('--output-dir', default=SIASAM_DIR, help='Carpeta donde se escriben los resultados')
+    parser.add_argument('--first-year', type=int, default=generate_catalogue.FIRST_YEAR)
+    parser.add_argument('--number-of-years', type=int, default=generate_catalogue.NUMBER_OF_YEARS)
+    parser.add_argument('--system-code', type=int, default=update_by_siasam.SYSTEM_CODE)
+    parser.add_argument('--save-intermediate', action='store_true', help='Escribe tambien solicitudes_minimas.csv y precedencia_solicitudes_minimas.csv')
+    parser.add_argument('--catalogue-cache', default=generate_catalogue.CATALOGUE_CACHE, help='Archivo de cache por planta del catalogo')
+    parser.add_argument('--num-processes', type=int, default=update_by_siasam.NUM_PROCESSES)
+    parser.add_argument('--allocation-solver', choices=['transport', 'networkx'], default=update_by_siasam.ALLOCATION_SOLVER)
+    parser.add_argument('--allocation-cache', default=update_by_siasam.ALLOCATION_CACHE, help='Archivo de cache por unidad de la alocacion')
+    parser.add_argument('--tol-starting-date', type=int, default=update_by_siasam.TOL_STARTING_DATE, help='Tolerancia en dias para la fecha de inicio de solicitudes duplicadas')
+    parser.add_argument('--tol-duration', type=int, default=update_by_siasam.TOL_DURATION, help='Tolerancia en dias para la duracion de solicitudes duplicadas')
+    parser.add_argument('--siasam-chunk-size', type=int, default=update_by_siasam.SIASAM_CHUNK_SIZE, help='Lee solicitudes_siasam.csv de a este numero de filas')
+    parser.add_argument('--run-report', default=update_by_siasam.RUN_REPORT, help='Nombre del reporte JSON de tiempos y contadores que se escribe en la carpeta de salida')
+    parser.add_argument('--run-report-memory', action='store_true', default=update_by_siasam.RUN_REPORT_MEMORY, help='Mide tambien la memoria pico de cada etapa (mas lento)')
+    args = parser.parse_args()
+    runPipeline(
+        args.catalogue_dir,
+        args.siasam_dir,
+        args.output_dir,
+        args.first_year,
+        args.number_of_years,
+        args.system_code,
+        args.save_intermediate,
+        args.catalogue_cache,
+        args.num_processes,
+        args.allocation_solver,
+        args.allocation_cache,
+        args.tol_starting_date,
+        args.tol_duration,
+        siasam_chunk_size=args.siasam_chunk_size,
+        run_report=args.run_report,
+        run_report_memory=args.run_report_memory
+    )
+
+if __name__ == '__main__':
+    main()
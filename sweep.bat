@@ -0,0 +1,3 @@
+@echo off
+python sweep.py %*
+pause
\ No newline at end of file
@@ -0,0 +1,144 @@
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import os
+
+import pipeline
+import generate_catalogue
+import update_by_siasam
+
+SUMMARY_FIELDS = [
+    'escenario',
+    'first_year',
+    'number_of_years',
+    'tol_starting_date',
+    'tol_duration',
+    'missing_catalogue_plants',
+    'catalogue_solicitations',
+    'siasam_solicitations',
+    'kept_solicitations',
+    'erased_solicitations',
+    'result_solicitations',
+    'irregularities_overlap',
+    'irregularities_duplicates',
+    'irregularities_fixed_duplicates',
+    'irregularities_fixed_overlap',
+    'error',
+]
+
+# Entradas leidas una sola vez; cada proceso las recibe al iniciar y solo las lee
+sweep_inputs = {}
+
+def setSweepInputs(inputs):
+    sweep_inputs.update(inputs)
+
+def getScenarios(first_years, numbers_of_years, tols_starting_date, tols_duration):
+    return [
+        {
+            'escenario': f"escenario_{first_year}_{number_of_years}_{tol_starting_date}_{tol_duration}",
+            'first_year': first_year,
+            'number_of_years': number_of_years,
+            'tol_starting_date': tol_starting_date,
+            'tol_duration': tol_duration,
+        }
+        for first_year, number_of_years, tol_starting_date, tol_duration
+        in itertools.product(first_years, numbers_of_years, tols_starting_date, tols_duration)
+    ]
+
+def runScenario(scenario):
+    # Un escenario que falla queda en la tabla con su error y no detiene a los demas
+    try:
+        summary = runScenarioPipeline(scenario)
+    except Exception as error:
+        return {**scenario, 'error': f"{type(error).__name__}: {error}"}
+    return {**scenario, **summary, 'error': ''}
+
+def runScenarioPipeline(scenario):
+    return pipeline.runPipeline(
+        sweep_inputs['catalogue_dir'],
+        sweep_inputs['siasam_dir'],
+        os.path.join(sweep_inputs['output_dir'], scenario['escenario']),
+        scenario['first_year'],
+        scenario['number_of_years'],
+        sweep_inputs['system_code'],
+        sweep_inputs['save_intermediate'],
+        None,
+        1,
+        sweep_inputs['allocation_solver'],
+        None,
+        scenario['tol_starting_date'],
+        scenario['tol_duration'],
+        sweep_inputs['catalogue_inputs'],
+        sweep_inputs['siasam_inputs']
+    )
+
+def runSweep(
+        scenarios,
+        catalogue_dir=pipeline.CATALOGUE_DIR,
+        siasam_dir=pipeline.SIASAM_DIR,
+        output_dir='escenarios',
+        system_code=update_by_siasam.SYSTEM_CODE,
+        num_workers=1,
+        save_intermediate=False,
+        allocation_solver=update_by_siasam.ALLOCATION_SOLVER
+    ):
+    # Lee las entradas una vez, corre cada escenario en su propia carpeta (en paralelo si num_workers > 1) y
+    # escribe la tabla resumen en output_dir/resumen_escenarios.csv, en el orden de los escenarios
+    os.makedirs(output_dir, exist_ok=True)
+    inputs = {
+        'catalogue_dir': catalogue_dir,
+        'siasam_dir': siasam_dir,
+        'output_dir': output_dir,
+        'system_code': system_code,
+        'save_intermediate': save_intermediate,
+        'allocation_solver': allocation_solver,
+        'catalogue_inputs': generate_catalogue.loadCatalogueInputs(catalogue_dir),
+        'siasam_inputs': update_by_siasam.loadSiasamInputs(siasam_dir, system_code),
+    }
+    if num_workers <= 1 or len(scenarios) < 2:
+        setSweepInputs(inputs)
+        summaries = [runScenario(scenario) for scenario in scenarios]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=setSweepInputs,
+            initargs=(inputs,)
+        ) as executor:
+            summaries = list(executor.map(runScenario, scenarios))
+    with open(os.path.join(output_dir, 'resumen_escenarios.csv'), 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS, restval='')
+        writer.writeheader()
+        writer.writerows(summaries)
+    return summaries
+
+def main():
+    parser = argparse.ArgumentParser(description='Corre el flujo completo para varias combinaciones de horizonte y tolerancias.')
+    parser.add_argument('--catalogue-dir', default=pipeline.CATALOGUE_DIR, help='Carpeta con las entradas de GenerateCatalogueSiasam')
+    parser.add_argument('--siasam-dir', default=pipeline.SIASAM_DIR, help='Carpeta con las entradas de UpdateSiasam')
+    parser.add_argument('--output-dir', default='escenarios', help='Carpeta con una subcarpeta por escenario y la tabla resumen')
+    parser.add_argument('--first-years', type=int, nargs='+', default=[generate_catalogue.FIRST_YEAR])
+    parser.add_argument('--numbers-of-years', type=int, nargs='+', default=[generate_catalogue.NUMBER_OF_YEARS])
+    parser.add_argument('--tols-starting-date', type=int, nargs='+', default=[update_by_siasam.TOL_STARTING_DATE])
+    parser.add_argument('--tols-duration', type=int, nargs='+', default=[update_by_siasam.TOL_DURATION])
+    parser.add_argument('--system-code', type=int, default=update_by_siasam.SYSTEM_CODE)
+    parser.add_argument('--num-workers', type=int, default=1, help='Escenarios corriendo al mismo tiempo')
+    parser.add_argument('--save-intermediate', action='store_true', help='Escribe tambien solicitudes_minimas.csv y precedencia_solicitudes_minimas.csv en cada escenario')
+    parser.add_argument('--allocation-solver', choices=['transport', 'networkx'], default=update_by_siasam.ALLOCATION_SOLVER)
+    args = parser.parse_args()
+    scenarios = getScenarios(args.first_years, args.numbers_of_years, args.tols_starting_date, args.tols_duration)
+    summaries = runSweep(
+        scenarios,
+        args.catalogue_dir,
+        args.siasam_dir,
+        args.output_dir,
+        args.system_code,
+        args.num_workers,
+        args.save_intermediate,
+        args.allocation_solver
+    )
+    for summary in summaries:
+        print(', '.join(f"{field}={summary.get(field, '')}" for field in SUMMARY_FIELDS))
+
+if __name__ == '__main__':
+    main()